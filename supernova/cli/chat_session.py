@@ -46,8 +46,38 @@ from supernova.cli.ui_utils import (
     display_generating_animation, theme_color, set_theme, format_rich_objects
 )
 
+# orjson is an optional speedup for pretty-printing large tool results
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 console = Console()
 
+
+def _format_json(value: Any) -> str:
+    """
+    Pretty-print a value as JSON with a two-space indent.
+    
+    With orjson installed the text differs from ``json.dumps(value, indent=2)``:
+    non-ASCII characters are written as-is instead of ``\\u``-escaped, NaN and
+    Infinity become ``null``, and floats use orjson's formatting (``1e20``
+    rather than ``1e+20``). Finite values read back the same either way.
+    
+    Args:
+        value: The value to serialize
+        
+    Returns:
+        The indented JSON string
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(value, option=orjson.OPT_INDENT_2).decode()
+        except TypeError:
+            # Types orjson refuses (e.g. huge ints) go through the stdlib
+            pass
+    return json.dumps(value, indent=2)
+
 def theme_color(color_name):
     """
     Get a color from the current theme.
@@ -980,7 +1010,7 @@ I am here to help you build great software!
                             # Try to format args as JSON for readability
                             if args.strip():
                                 parsed_args = json.loads(args)
-                                formatted_args = json.dumps(parsed_args, indent=2)
+                                formatted_args = _format_json(parsed_args)
                                 tool_call_content += f"\nArguments:\n```json\n{formatted_args}\n```"
                         except json.JSONDecodeError:
                             # If parsing fails, just include the raw args
@@ -1278,7 +1308,7 @@ I am here to help you build great software!
                 # Format the result for display
                 if isinstance(raw_result, dict) or isinstance(raw_result, list):
                     try:
-                        formatted_result = json.dumps(raw_result, indent=2)
+                        formatted_result = _format_json(raw_result)
                     except Exception:
                         formatted_result = str(raw_result)
                 else:
@@ -1692,10 +1722,10 @@ I am here to help you build great software!
                                             # Try to format args as JSON for readability
                                             if isinstance(function_args, str) and function_args.strip():
                                                 parsed_args = json.loads(function_args)
-                                                formatted_args = json.dumps(parsed_args, indent=2)
+                                                formatted_args = _format_json(parsed_args)
                                                 tool_call_content += f"\nArguments:\n```json\n{formatted_args}\n```"
                                             elif isinstance(function_args, (dict, list)):
-                                                formatted_args = json.dumps(function_args, indent=2)
+                                                formatted_args = _format_json(function_args)
                                                 tool_call_content += f"\nArguments:\n```json\n{formatted_args}\n```"
                                             else:
                                                 tool_call_content += f"\nArguments: {function_args}"
@@ -2094,12 +2124,10 @@ I am here to help you build great software!
         try:
             if isinstance(result, dict):
                 # Try to convert to JSON
-                import json
-                return json.dumps(result, indent=2)
+                return _format_json(result)
             elif isinstance(result, list):
                 # Try to convert to JSON
-                import json
-                return json.dumps(result, indent=2)
+                return _format_json(result)
             else:
                 # Just convert to string
                 return str(result)
@@ -2245,7 +2273,7 @@ I am here to help you build great software!
         # Use the file reference tool to process the message
         result = self.file_reference_tool.execute({
             "message": message,
-            "working_dir": str(self.cwd)
+            "working_dir": self.session_state["cwd"]
         })
         
         # If no references were found or processing failed, return the original message
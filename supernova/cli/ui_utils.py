@@ -4,6 +4,7 @@ SuperNova - AI-powered development assistant within the terminal.
 UI utilities and animations for the CLI interface.
 """
 
+import re
 import time
 import threading
 import itertools
@@ -25,6 +26,10 @@ from rich.box import Box, ROUNDED
 
 console = Console()
 
+# Fenced code blocks in responses, and the placeholders display_response swaps in for them
+_CODE_BLOCK_RE = re.compile(r'```(\w*)\n(.*?)```', re.DOTALL)
+_CODE_BLOCK_PLACEHOLDER_RE = re.compile(r'(__CODE_BLOCK_\d+__)')
+
 # Custom spinner patterns
 SPINNERS = {
     "dots": ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"],
@@ -377,8 +382,7 @@ def display_response(content: str, role: str = "assistant") -> None:
     # Process markdown in the content
     try:
         # Extract code blocks for syntax highlighting
-        import re
-        code_blocks = re.findall(r'```(\w*)\n(.*?)```', content, re.DOTALL)
+        code_blocks = _CODE_BLOCK_RE.findall(content)
         
         if code_blocks:
             # Replace code blocks with placeholders
@@ -390,7 +394,7 @@ def display_response(content: str, role: str = "assistant") -> None:
             
             # Split by placeholders
             parts = []
-            for part in re.split(r'(__CODE_BLOCK_\d+__)', content):
+            for part in _CODE_BLOCK_PLACEHOLDER_RE.split(content):
                 if part in placeholder_map:
                     lang, code = placeholder_map[part]
                     parts.append(Syntax(code, lang, theme="monokai", line_numbers=True))
@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional, Tuple, Union
 
 import yaml
 from dotenv import load_dotenv
+from pydantic import BaseModel
 from rich.console import Console
 
 from supernova.config.schema import SuperNovaConfig
@@ -22,6 +23,14 @@ DEFAULT_CONFIG_PATH = Path(__file__).parent.parent.parent / "config.yaml"
 USER_CONFIG_DIR = Path.home() / ".supernova"
 USER_CONFIG_PATH = USER_CONFIG_DIR / "config.yaml"
 
+# Prefer the libyaml-backed loader/dumper when PyYAML was built with it
+try:
+    from yaml import CSafeDumper as _YamlDumper
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeDumper as _YamlDumper
+    from yaml import SafeLoader as _YamlLoader
+
 
 def _expand_env_vars(value: str) -> str:
     """
@@ -137,7 +146,7 @@ def load_config(config_path: Optional[Union[str, Path]] = None) -> SuperNovaConf
     
     try:
         with open(config_path, "r") as f:
-            config_dict = yaml.safe_load(f)
+            config_dict = yaml.load(f, Loader=_YamlLoader)
         
         # Process environment variables
         processed_config = _process_config_dict(config_dict)
@@ -158,6 +167,25 @@ def load_config(config_path: Optional[Union[str, Path]] = None) -> SuperNovaConf
         raise
 
 
+def _dump_value(value: Any) -> Any:
+    """
+    Convert a configuration value to plain Python data.
+    
+    Args:
+        value: A model, container or scalar taken from the configuration
+        
+    Returns:
+        The value with any nested models converted to dictionaries
+    """
+    if isinstance(value, BaseModel):
+        return value.model_dump()
+    if isinstance(value, dict):
+        return {key: _dump_value(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_dump_value(item) for item in value]
+    return value
+
+
 def get_config_value(config: SuperNovaConfig, key_path: str) -> Tuple[Any, str]:
     """
     Get a configuration value by its dot-notation path.
@@ -169,22 +197,21 @@ def get_config_value(config: SuperNovaConfig, key_path: str) -> Tuple[Any, str]:
     Returns:
         Tuple of (value, type) where type is the string representation of the Python type
     """
-    # Convert the config to a dict for easier nested access
-    config_dict = config.model_dump()
-    
-    # Split the key path by dots
-    keys = key_path.split('.')
-    
-    # Navigate through the config dict
-    current = config_dict
-    try:
-        for key in keys:
+    # Walk the model directly so only the requested value gets dumped
+    current = config
+    for key in key_path.split('.'):
+        if isinstance(current, BaseModel) and key in type(current).model_fields:
+            current = getattr(current, key)
+        elif isinstance(current, dict) and key in current:
             current = current[key]
-    except (KeyError, TypeError):
-        raise KeyError(f"Key '{key_path}' not found in configuration")
+        else:
+            raise KeyError(f"Key '{key_path}' not found in configuration")
+    
+    # Sections come back as plain dicts, as model_dump() would return them
+    value = _dump_value(current)
     
     # Return the value and its type
-    return current, type(current).__name__
+    return value, type(value).__name__
 
 
 def set_config_value(config_dict: Dict, key_path: str, value: str) -> Dict:
@@ -301,6 +328,12 @@ def save_config(config: Union[SuperNovaConfig, Dict], config_path: Optional[Unio
     
     # Save the config
     with open(config_path, "w") as f:
-        yaml.dump(config_dict, f, default_flow_style=False, sort_keys=False)
+        yaml.dump(
+            config_dict,
+            f,
+            Dumper=_YamlDumper,
+            default_flow_style=False,
+            sort_keys=False,
+        )
     
     return config_path 
\ No newline at end of file
@@ -4,7 +4,6 @@ SuperNova - AI-powered development assistant within the terminal.
 Tool Base - Base class for all tools in the SuperNova ecosystem.
 """
 
-import os
 from abc import ABC, abstractmethod
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
@@ -214,22 +213,64 @@ class SupernovaTool(ABC):
         """
         Validate that all required arguments are provided.
         
+        Arguments declared as integers in the schema are converted in place,
+        so the tool can use them without converting them again.
+        
         Args:
             args: Dictionary of arguments to validate
             
         Returns:
             Dictionary with validation results containing:
-            - 'valid' (bool): Whether all required arguments are present
+            - 'valid' (bool): Whether all required arguments are present and valid
             - 'missing' (list): List of missing argument names if any
+            - 'invalid' (list): List of arguments that could not be converted
         """
         schema = self.get_arguments_schema()
         required_args = schema.get("required", [])
         missing_args = [arg for arg in required_args if arg not in args]
+        integer_args = [
+            arg_name for arg_name, prop in schema.get("properties", {}).items()
+            if prop.get("type") == "integer"
+        ]
+        invalid_args = self._coerce_integer_args(args, integer_args)
         
         return {
-            'valid': len(missing_args) == 0,
-            'missing': missing_args
+            'valid': not missing_args and not invalid_args,
+            'missing': missing_args,
+            'invalid': invalid_args
         }
+    
+    @staticmethod
+    def _coerce_integer_args(args: Dict, names: List[str]) -> List[str]:
+        """
+        Convert the named arguments to integers in place.
+        
+        Booleans and floats with a fractional part are rejected rather than
+        converted, so True does not become 1 and 2.5 does not become 2.
+        
+        Args:
+            args: Dictionary of arguments to update
+            names: Names of the arguments that should be integers
+            
+        Returns:
+            Names of the arguments that could not be converted
+        """
+        invalid_args = []
+        for name in names:
+            if name not in args:
+                continue
+            value = args[name]
+            if isinstance(value, bool) or (isinstance(value, float) and not value.is_integer()):
+                invalid_args.append(name)
+                continue
+            if isinstance(value, int):
+                continue
+            try:
+                args[name] = int(value)
+            except (ValueError, TypeError, OverflowError):
+                invalid_args.append(name)
+        
+        return invalid_args
 
     def _resolve_path(self, path: Union[str, Path], base_dir: Optional[Union[str, Path]] = None) -> Path:
         """
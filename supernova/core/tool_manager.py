@@ -7,8 +7,6 @@ Tool Manager - Responsible for loading, registering, and managing tools.
 import importlib
 import importlib.util
 import inspect
-import os
-import sys
 import pkgutil
 import logging
 from pathlib import Path
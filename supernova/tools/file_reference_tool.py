@@ -9,13 +9,8 @@ import re
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
 
-from rich.console import Console
-from rich.panel import Panel
-
 from supernova.core.tool_base import SupernovaTool, FileToolMixin
 
-console = Console()
-
 class FileReferenceTool(SupernovaTool, FileToolMixin):
     """Tool for detecting and processing file/folder references in user messages."""
     
@@ -4,39 +4,760 @@ SuperNova - AI-powered development assistant within the terminal.
 Tool to execute terminal commands.
 """
 
+import asyncio
+import atexit
 import os
 import re
+import selectors
+import shlex
+import shutil
+import signal
 import subprocess
-import tempfile
+import threading
+import time
+import uuid
 from pathlib import Path
-from typing import Any, Dict, List, Optional, Tuple, Union
-from functools import partial
-
-from rich.console import Console
-from rich.panel import Panel
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, ClassVar, Dict, FrozenSet, List, Mapping, Optional, Tuple, Union
 
 from supernova.core.tool_base import SupernovaTool
 
-console = Console()
+if TYPE_CHECKING:
+    from rich.console import Console
+
+# Rich is imported on first use so that registering the tool (for example to
+# build its schema) does not load the rendering machinery.
+_console: Optional["Console"] = None
+
+
+def _get_console() -> "Console":
+    """Return the shared Rich console, creating it on first use."""
+    global _console
+    if _console is None:
+        from rich.console import Console
+        _console = Console()
+    return _console
+
+# Selector shared by all synchronous executions so that draining a child's
+# pipes does not construct a new selector (or helper threads) per command.
+_SEL = selectors.DefaultSelector()
+_SEL_LOCK = threading.Lock()
+_READ_SIZE = 65536
+
+
+def _pipe_size() -> int:
+    """
+    Pick the kernel pipe buffer requested for command output.
+
+    Returns:
+        1 MiB, or the system's pipe-max-size if that is smaller, since
+        unprivileged processes cannot grow a pipe past it
+    """
+    try:
+        with open("/proc/sys/fs/pipe-max-size") as f:
+            return min(1 << 20, int(f.read()))
+    except (OSError, ValueError):
+        return 1 << 20
+
+
+# Kernel pipe buffer requested for command output (Linux only, ignored
+# elsewhere) so chatty commands do not stall on a full 64 KiB pipe
+_PIPE_SIZE = _pipe_size()
+# Cleared once the kernel refuses _PIPE_SIZE, after which pipes keep their
+# default size
+_use_pipesize = True
+
+_DEFAULT_TIMEOUT = 30
+# Bounds for a caller-supplied timeout, in seconds
+_MIN_TIMEOUT = 1
+_MAX_TIMEOUT = 600
+# Buffer limit for asyncio pipe readers
+_STREAM_LIMIT = 1 << 20
+
+# Fixed error results; copied on return so callers can add to them
+_NOT_A_DICT_RESULT = {"success": False, "error": "Arguments must be a dictionary"}
+_NO_COMMAND_RESULT = {"success": False, "error": "No command provided"}
+_TIMEOUT_RESULT = {"success": False, "error": "Command execution timed out"}
+
+# Shells are resolved once at import instead of on every shell=True call.
+_POSIX_SHELL = "/bin/sh" if os.name != "nt" else None
+_BASH = "/bin/bash" if _POSIX_SHELL and os.path.exists("/bin/bash") else None
+
+
+def _shell_executable(command: str) -> Optional[str]:
+    """
+    Pick the shell used to run a command.
+
+    Args:
+        command: The command to execute
+
+    Returns:
+        ``/bin/bash`` for commands using bash-only ``[[`` tests, ``/bin/sh``
+        otherwise, or None on Windows to keep the platform default
+    """
+    if _BASH and "[[" in command:
+        return _BASH
+    return _POSIX_SHELL
+
+
+# Programs that behave the same when executed directly with plain arguments
+_DIRECT_COMMANDS = frozenset({
+    "pwd", "ls", "cat", "git", "python", "python3", "which", "whoami", "date"
+})
+# Anything a shell would expand, redirect, chain, escape or treat as a comment
+_SHELL_SYNTAX_RE = re.compile(r"[;|&<>$`(){}*?\[\]~#!\\\n]")
+
+
+def _direct_argv(command: str) -> Optional[List[str]]:
+    """
+    Split a command that can run without a shell.
+
+    Args:
+        command: The command to execute
+
+    Returns:
+        The argument list for a simple command from ``_DIRECT_COMMANDS``, or
+        None if the command needs a shell
+    """
+    if _POSIX_SHELL is None or _SHELL_SYNTAX_RE.search(command):
+        return None
+    try:
+        argv = shlex.split(command)
+    except ValueError:
+        return None
+    if not argv or argv[0] not in _DIRECT_COMMANDS:
+        return None
+    return argv
+
+
+def _popen(args: Union[str, List[str]], **kwargs: Any) -> subprocess.Popen:
+    """
+    Start a process with enlarged output pipes.
+
+    Args:
+        args: Program and arguments, or a command string with ``shell=True``
+        **kwargs: Further arguments for ``subprocess.Popen``
+
+    Returns:
+        The started process
+    """
+    global _use_pipesize
+    if _use_pipesize:
+        try:
+            return subprocess.Popen(args, pipesize=_PIPE_SIZE, **kwargs)
+        except PermissionError:
+            # The user's pipe buffer quota is used up; keep the default size
+            # from now on instead of failing and retrying on every spawn
+            _use_pipesize = False
+    return subprocess.Popen(args, **kwargs)
+
+
+async def _create_subprocess(factory: Callable[..., Awaitable[asyncio.subprocess.Process]], *args: Any, **kwargs: Any) -> asyncio.subprocess.Process:
+    """
+    Start an asyncio process with enlarged output pipes.
+
+    Args:
+        factory: ``asyncio.create_subprocess_exec`` or ``create_subprocess_shell``
+        *args: Positional arguments for the factory
+        **kwargs: Keyword arguments for the factory
+
+    Returns:
+        The started process
+    """
+    global _use_pipesize
+    if _use_pipesize:
+        try:
+            return await factory(*args, pipesize=_PIPE_SIZE, **kwargs)
+        except PermissionError:
+            # The user's pipe buffer quota is used up; keep the default size
+            # from now on instead of failing and retrying on every spawn
+            _use_pipesize = False
+    return await factory(*args, **kwargs)
+
+
+def _spawn(command: str, cwd: str) -> subprocess.Popen:
+    """
+    Start a one-shot process for a command.
+
+    Simple commands are executed directly, saving the fork+exec of an
+    intermediate shell; everything else runs through the shell.
+
+    Args:
+        command: The command to execute
+        cwd: Directory to run the command in
+
+    Returns:
+        The started process, with stdin from ``/dev/null`` (as in the shell
+        pool) and stdout and stderr piped
+    """
+    argv = _direct_argv(command)
+    if argv is not None:
+        try:
+            return _popen(
+                argv,
+                cwd=cwd,
+                stdin=subprocess.DEVNULL,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE,
+                start_new_session=True
+            )
+        except FileNotFoundError:
+            # Let the shell report a missing program (or directory) as usual
+            pass
+    return _popen(
+        command,
+        cwd=cwd,
+        shell=True,
+        executable=_shell_executable(command),
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True
+    )
+
+
+async def _spawn_async(command: str, cwd: str) -> asyncio.subprocess.Process:
+    """
+    Start a one-shot asyncio process for a command.
+
+    Args:
+        command: The command to execute
+        cwd: Directory to run the command in
+
+    Returns:
+        The started process, with stdin from ``/dev/null`` (as in the shell
+        pool) and stdout and stderr piped
+    """
+    argv = _direct_argv(command)
+    if argv is not None:
+        try:
+            return await _create_subprocess(
+                asyncio.create_subprocess_exec,
+                *argv,
+                cwd=cwd,
+                stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                start_new_session=True,
+                limit=_STREAM_LIMIT
+            )
+        except FileNotFoundError:
+            pass
+    return await _create_subprocess(
+        asyncio.create_subprocess_shell,
+        command,
+        cwd=cwd,
+        executable=_shell_executable(command),
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+        limit=_STREAM_LIMIT
+    )
+
+
+# Values an unquoted $VAR passes to echo unchanged: a single word that the
+# shell will not glob and echo will not take as an option or an escape
+_PLAIN_VALUE_RE = re.compile(r"(?:[^\s*?\[\\-][^\s*?\[\\]*)?")
+
+
+def _echo_variable(name: str) -> Optional[Tuple[int, str, str]]:
+    """
+    Answer ``echo $NAME`` from the environment.
+
+    Args:
+        name: Name of the environment variable
+
+    Returns:
+        Tuple of (return_code, stdout, stderr), or None if the shell would
+        split, glob or reinterpret the value
+    """
+    value = os.environ.get(name, "")
+    if not _PLAIN_VALUE_RE.fullmatch(value):
+        return None
+    return 0, value + "\n", ""
+
+
+# Pure environment lookups answered in-process instead of spawning a shell.
+# Each handler receives the regex match and the working directory and returns
+# (return_code, stdout, stderr), or None to leave the command to the shell.
+_BUILTINS = (
+    (re.compile(r"pwd"),
+     lambda match, cwd: (0, os.path.realpath(cwd) + "\n", "")),
+    (re.compile(r"echo\s+\$(?P<brace>\{)?(?P<name>[A-Za-z_][A-Za-z0-9_]*)(?(brace)\})"),
+     lambda match, cwd: _echo_variable(match.group("name"))),
+    (re.compile(r"which\s+([\w.+-]+)"),
+     lambda match, cwd: _which(match.group(1))),
+)
+
+
+# Potentially dangerous command patterns, compiled once into a single
+# alternation so each check is one scan of the command
+_DANGEROUS_PATTERNS = (
+    r"rm\s+-rf\s+/",
+    r"rm\s+-rf\s+~",
+    r"rm\s+-rf\s+\*",
+    r":\(\)\s*\{\s*:\|:&\s*\};:",
+    r"dd\s+.*\s+of=/dev/",
+    r">\s+/dev/",
+    r">\s+/proc/",
+    r">\s+/sys/",
+    r"shutdown",
+    r"mkfs",
+    r"reboot",
+    r"halt",
+    r"poweroff",
+)
+_DANGEROUS_RE = re.compile(
+    "|".join(f"(?:{pattern})" for pattern in _DANGEROUS_PATTERNS),
+    re.IGNORECASE
+)
+
+
+def _which(program: str) -> Tuple[int, str, str]:
+    """Resolve a program on PATH the way ``which`` does."""
+    path = shutil.which(program)
+    if path is None:
+        return 1, "", ""
+    return 0, path + "\n", ""
+
+
+def _run_builtin(command: str, cwd: str) -> Optional[Tuple[int, str, str]]:
+    """
+    Answer a well-known introspection command without a subprocess.
+
+    Args:
+        command: The command to execute
+        cwd: Working directory the command would run in
+
+    Returns:
+        Tuple of (return_code, stdout, stderr), or None if the command is not
+        a built-in or has to run in a real shell
+    """
+    command = command.strip()
+    for pattern, handler in _BUILTINS:
+        match = pattern.fullmatch(command)
+        if match:
+            return handler(match, cwd)
+    return None
+
+
+def _communicate(process: subprocess.Popen, timeout: float) -> Tuple[str, str]:
+    """
+    Drain a child's stdout and stderr through the shared selector.
+
+    Output is captured as bytes and decoded once as UTF-8, replacing
+    undecodable bytes. Falls back to ``process.communicate`` on platforms
+    without selectable pipes or when another thread is already using the
+    shared selector.
+
+    Args:
+        process: Process started in binary mode with ``stdout=PIPE`` and
+            ``stderr=PIPE``
+        timeout: Maximum time in seconds to wait for the process
+
+    Returns:
+        Tuple of (stdout, stderr)
+
+    Raises:
+        subprocess.TimeoutExpired: If the process does not finish in time
+    """
+    if os.name == "nt" or not _SEL_LOCK.acquire(blocking=False):
+        stdout, stderr = process.communicate(timeout=timeout)
+        return _decode(stdout), _decode(stderr)
+
+    buffers = {}
+    try:
+        for stream in (process.stdout, process.stderr):
+            fd = stream.fileno()
+            os.set_blocking(fd, False)
+            buffers[fd] = bytearray()
+            _SEL.register(fd, selectors.EVENT_READ)
+
+        deadline = time.monotonic() + timeout
+        while _SEL.get_map():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(process.args, timeout)
+            for key, _ in _SEL.select(timeout=remaining):
+                try:
+                    chunk = os.read(key.fd, _READ_SIZE)
+                except BlockingIOError:
+                    continue
+                if chunk:
+                    buffers[key.fd] += chunk
+                else:
+                    _SEL.unregister(key.fd)
+
+        process.wait(timeout=max(deadline - time.monotonic(), 0))
+    finally:
+        for fd in buffers:
+            if fd in _SEL.get_map():
+                _SEL.unregister(fd)
+        _SEL_LOCK.release()
+
+    stdout_fd, stderr_fd = process.stdout.fileno(), process.stderr.fileno()
+    return _decode(buffers[stdout_fd]), _decode(buffers[stderr_fd])
+
+
+def _decode(data: Optional[bytes]) -> str:
+    """Decode captured output as UTF-8, replacing invalid bytes."""
+    if not data:
+        return ""
+    return bytes(data).decode("utf-8", errors="replace")
+
+
+def _signal_process_group(process: Union[subprocess.Popen, asyncio.subprocess.Process]) -> None:
+    """
+    Send SIGKILL to a command's process group.
+
+    Commands are started in their own session, so killing the process group
+    also stops the rest of a shell pipeline. On platforms without process
+    groups only the process itself is killed.
+
+    Args:
+        process: Process started with ``start_new_session=True``
+    """
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(os.getpgid(process.pid), signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+def _kill_process_group(process: subprocess.Popen) -> None:
+    """
+    Kill a timed-out command together with any children it spawned.
+
+    Reaps the process and closes its pipes so they are released promptly.
+
+    Args:
+        process: Process started with ``start_new_session=True``
+    """
+    _signal_process_group(process)
+
+    try:
+        process.wait(timeout=1)
+    except subprocess.TimeoutExpired:
+        pass
+
+    for stream in (process.stdout, process.stderr):
+        if stream is not None:
+            stream.close()
+
+
+# Environment variable names the pooled shell can export itself
+_ENV_NAME_RE = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+# A single "&" backgrounds a job that could keep writing to the pooled shell's
+# pipes after the command returns ("&&", ">&", "&>" and "|&" are fine).
+_BACKGROUND_RE = re.compile(r"(?<![&>|])&(?![&>])")
+
+
+class _ShellPool:
+    """
+    A long-lived shell process that runs commands written to its stdin.
+
+    Saves the fork+exec of a fresh shell for every command. Each command
+    runs in a subshell with stdin from ``/dev/null`` so that ``cd``,
+    ``export`` and ``exit`` cannot leak into later commands, and is passed
+    through ``eval`` so a syntax error cannot desynchronize the shell. The
+    end of each command's output is detected with a random sentinel.
+    Changes to ``os.environ`` since the previous command are replayed into
+    the shell first, so commands see the same environment a one-shot
+    process would.
+    """
+    
+    def __init__(self, executable: str):
+        """
+        Initialize the pool.
+        
+        Args:
+            executable: Path to the shell executable
+        """
+        self._executable = executable
+        self._lock = threading.Lock()
+        self._process = None
+        self._selector = None
+        self._environ = {}
+    
+    def _start(self) -> None:
+        """Start the shell process."""
+        self._environ = dict(os.environ)
+        self._process = subprocess.Popen(
+            [self._executable],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            env=self._environ,
+            start_new_session=True
+        )
+        self._selector = selectors.DefaultSelector()
+        for stream in (self._process.stdout, self._process.stderr):
+            os.set_blocking(stream.fileno(), False)
+            self._selector.register(stream.fileno(), selectors.EVENT_READ, stream is self._process.stdout)
+    
+    def close(self) -> None:
+        """Kill the shell and everything it started."""
+        if self._process is not None:
+            _kill_process_group(self._process)
+            try:
+                self._process.stdin.close()
+            except OSError:
+                pass
+            self._selector.close()
+        self._process = None
+        self._selector = None
+    
+    def _sync_environ(self) -> Optional[str]:
+        """
+        Build the shell lines that bring the shell up to date with os.environ.
+        
+        Returns:
+            ``export``/``unset`` lines for every variable that changed since
+            the last call, an empty string if nothing changed, or None if a
+            changed name (such as ``FOO.BAR``) cannot be set from the shell
+            and the shell has to be restarted instead
+        """
+        environ = dict(os.environ)
+        if environ == self._environ:
+            return ""
+        removed = self._environ.keys() - environ.keys()
+        changed = [name for name, value in environ.items() if self._environ.get(name) != value]
+        if not all(_ENV_NAME_RE.fullmatch(name) for name in (*removed, *changed)):
+            return None
+        self._environ = environ
+        return "".join(
+            [f"unset {name}\n" for name in removed]
+            + [f"export {name}={shlex.quote(environ[name])}\n" for name in changed]
+        )
+    
+    def run(self, command: str, cwd: str, timeout: float) -> Optional[Tuple[int, str, str]]:
+        """
+        Run a command in the pooled shell.
+        
+        Args:
+            command: The command to execute
+            cwd: Directory to run the command in
+            timeout: Maximum time in seconds to wait for the command
+            
+        Returns:
+            Tuple of (return_code, stdout, stderr), or None without running the
+            command if another thread is using the shell
+            
+        Raises:
+            subprocess.TimeoutExpired: If the command does not finish in time;
+                the shell is killed and restarted on the next call
+            OSError: If the shell cannot be started
+            RuntimeError: If the shell exits while running the command
+            
+        Whatever the error, the shell is discarded and restarted on the next
+        call.
+        """
+        # Waiting for the lock would not count against the caller's timeout;
+        # a busy pool sends the caller to a one-shot process instead
+        if not self._lock.acquire(blocking=False):
+            return None
+        try:
+            return self._run(command, cwd, timeout)
+        except BaseException:
+            # The command may still be writing to the shell; throw the
+            # shell away so its output cannot reach the next caller
+            self.close()
+            raise
+        finally:
+            self._lock.release()
+    
+    def _run(self, command: str, cwd: str, timeout: float) -> Tuple[int, str, str]:
+        """Run a command in the shell; the caller holds the lock."""
+        if self._process is None or self._process.poll() is not None:
+            self.close()
+            self._start()
+        environ_lines = self._sync_environ()
+        if environ_lines is None:
+            self.close()
+            self._start()
+            environ_lines = ""
+        
+        token = uuid.uuid4().hex
+        script = (
+            f"{environ_lines}"
+            f"( cd {shlex.quote(cwd)} && eval {shlex.quote(command)} ) < /dev/null\n"
+            f"printf '\\n{token} %d\\n' $?\n"
+            f"printf '\\n{token}\\n' >&2\n"
+        )
+        self._process.stdin.write(script.encode("utf-8"))
+        self._process.stdin.flush()
+        
+        stdout_marker = f"\n{token} ".encode()
+        stderr_marker = f"\n{token}\n".encode()
+        stdout, stderr = bytearray(), bytearray()
+        stdout_end = stderr_end = -1
+        returncode = None
+        deadline = time.monotonic() + timeout
+        
+        while returncode is None or stderr_end < 0:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise subprocess.TimeoutExpired(command, timeout)
+            for key, _ in self._selector.select(timeout=remaining):
+                try:
+                    chunk = os.read(key.fd, _READ_SIZE)
+                except BlockingIOError:
+                    continue
+                if not chunk:
+                    raise RuntimeError("Shell exited while running the command")
+                # Only search the new chunk and the tail a marker could
+                # straddle, so large outputs are not rescanned per chunk
+                if key.data:
+                    start = max(0, len(stdout) - len(stdout_marker) + 1)
+                    stdout += chunk
+                    if stdout_end < 0:
+                        stdout_end = stdout.find(stdout_marker, start)
+                else:
+                    start = max(0, len(stderr) - len(stderr_marker) + 1)
+                    stderr += chunk
+                    if stderr_end < 0:
+                        stderr_end = stderr.find(stderr_marker, start)
+            
+            if stdout_end >= 0 and returncode is None:
+                status_start = stdout_end + len(stdout_marker)
+                status_end = stdout.find(b"\n", status_start)
+                if status_end >= 0:
+                    returncode = int(stdout[status_start:status_end])
+        
+        return returncode, _decode(stdout[:stdout_end]), _decode(stderr[:stderr_end])
+
+
+_shell_pool = None
+
+
+def _get_shell_pool() -> Optional[_ShellPool]:
+    """Return the shared shell pool, or None where there is no POSIX shell."""
+    global _shell_pool
+    if _shell_pool is None and _POSIX_SHELL:
+        _shell_pool = _ShellPool(_POSIX_SHELL)
+        atexit.register(_shell_pool.close)
+    return _shell_pool
+
+
+def _print_output(text: str, title: str) -> None:
+    """
+    Print command output, skipping the panel for empty or one-line results.
+
+    Args:
+        text: Output text to display
+        title: Title for the output block
+    """
+    if not text or not text.strip():
+        return
+    if len(text) < 80 and "\n" not in text.strip():
+        _get_console().print(f"[dim]{title}:[/dim] {text.strip()}")
+    else:
+        from rich.panel import Panel
+        _get_console().print(Panel(text, title=title, expand=False))
+
+
+# Schemas and examples are built once and shared by every call; callers must
+# treat them as read-only. They stay plain dicts so they remain JSON
+# serializable for the LLM APIs.
+_PARAMETERS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "command": {
+            "type": "string",
+            "description": "The terminal command to execute"
+        },
+        "working_dir": {
+            "type": "string",
+            "description": "Directory to execute the command in"
+        },
+        "explanation": {
+            "type": "string",
+            "description": "Explanation of what this command does"
+        },
+        "timeout": {
+            "type": "integer",
+            "description": "Timeout in seconds for the command"
+        }
+    },
+    "required": ["command"]
+}
+
+_ARGUMENTS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "command": {
+            "type": "string",
+            "description": "The command to execute"
+        },
+        "explanation": {
+            "type": "string",
+            "description": "Explanation of what this command does"
+        },
+        "working_dir": {
+            "type": "string",
+            "description": "Directory to run the command in"
+        },
+        "timeout": {
+            "type": "integer",
+            "description": "Timeout in seconds for the command"
+        }
+    },
+    "required": ["command"]
+}
+
+_USAGE_EXAMPLES = [
+    {
+        "description": "List files in the current directory",
+        "arguments": {
+            "command": "ls -la"
+        }
+    },
+    {
+        "description": "Check git status",
+        "arguments": {
+            "command": "git status"
+        }
+    }
+]
+
 
 class TerminalCommandTool(SupernovaTool):
     """Tool for executing terminal commands."""
     
     description = "Execute a terminal command in the current working directory."
     
+    # Answer pwd / which / echo $VAR in-process; disable for real process semantics
+    use_builtins = True
+    # Run synchronous commands in a long-lived /bin/sh instead of a new shell per call
+    use_shell_pool = True
+    
+    NAME: ClassVar[str] = "terminal_command"
+    DESCRIPTION: ClassVar[str] = "Execute a terminal command and get its output"
+    REQUIRED_ARGS: ClassVar[Mapping[str, str]] = MappingProxyType({
+        "command": "The terminal command to execute"
+    })
+    OPTIONAL_ARGS: ClassVar[Mapping[str, str]] = MappingProxyType({
+        "working_dir": "Directory to execute the command in",
+        "explanation": "Explanation of what this command does",
+        "timeout": "Timeout in seconds for the command"
+    })
+    
+    _REQUIRED_ARGS: ClassVar[FrozenSet[str]] = frozenset(_ARGUMENTS_SCHEMA["required"])
+    _INTEGER_ARGS: ClassVar[FrozenSet[str]] = frozenset(
+        name for name, prop in _ARGUMENTS_SCHEMA["properties"].items()
+        if prop["type"] == "integer"
+    )
+    
     def __init__(self):
         """Initialize the terminal command tool."""
         super().__init__(
-            name="terminal_command",
-            description="Execute a terminal command and get its output",
-            required_args={
-                "command": "The terminal command to execute"
-            },
-            optional_args={
-                "working_dir": "Directory to execute the command in",
-                "explanation": "Explanation of what this command does",
-                "timeout": "Timeout in seconds for the command"
-            }
+            name=self.NAME,
+            description=self.DESCRIPTION,
+            required_args=self.REQUIRED_ARGS,
+            optional_args=self.OPTIONAL_ARGS
         )
     
     def get_schema(self) -> Dict[str, Any]:
@@ -49,67 +770,66 @@ class TerminalCommandTool(SupernovaTool):
         return {
             "name": self.name,
             "description": self.description,
-            "parameters": {
-                "type": "object",
-                "properties": {
-                    "command": {
-                        "type": "string",
-                        "description": "The terminal command to execute"
-                    },
-                    "working_dir": {
-                        "type": "string",
-                        "description": "Directory to execute the command in"
-                    },
-                    "explanation": {
-                        "type": "string",
-                        "description": "Explanation of what this command does"
-                    },
-                    "timeout": {
-                        "type": "integer",
-                        "description": "Timeout in seconds for the command"
-                    }
-                },
-                "required": ["command"]
-            }
+            "parameters": _PARAMETERS_SCHEMA
         }
     
     def get_arguments_schema(self) -> Dict[str, Any]:
         """Get the JSON schema for the tool's arguments."""
-        return {
-            "type": "object",
-            "properties": {
-                "command": {
-                    "type": "string",
-                    "description": "The command to execute"
-                },
-                "explanation": {
-                    "type": "string",
-                    "description": "Explanation of what this command does"
-                },
-                "working_dir": {
-                    "type": "string",
-                    "description": "Directory to run the command in"
-                }
-            },
-            "required": ["command"]
-        }
+        return _ARGUMENTS_SCHEMA
     
     def get_usage_examples(self) -> List[Dict[str, Any]]:
         """Get examples of how to use the tool."""
-        return [
-            {
-                "description": "List files in the current directory",
-                "arguments": {
-                    "command": "ls -la"
-                }
-            },
-            {
-                "description": "Check git status",
-                "arguments": {
-                    "command": "git status"
-                }
+        return _USAGE_EXAMPLES
+    
+    def validate_args(self, args: Dict) -> Dict:
+        """
+        Validate that all required arguments are provided.
+        
+        Integer arguments such as timeout are converted in place, and the
+        timeout is clamped to between 1 and 600 seconds.
+        
+        Args:
+            args: Dictionary of arguments to validate
+            
+        Returns:
+            Dictionary with 'valid' (bool), 'missing' (list) and 'invalid' (list) keys
+        """
+        missing = self._REQUIRED_ARGS - args.keys()
+        invalid = self._coerce_integer_args(args, sorted(self._INTEGER_ARGS & args.keys()))
+        if "timeout" in args and "timeout" not in invalid:
+            args["timeout"] = min(max(args["timeout"], _MIN_TIMEOUT), _MAX_TIMEOUT)
+        return {
+            'valid': not missing and not invalid,
+            'missing': sorted(missing),
+            'invalid': invalid
+        }
+    
+    def _check_args(self, args: Any) -> Optional[Dict[str, Any]]:
+        """
+        Validate tool arguments before running a command.
+        
+        Args:
+            args: Arguments passed to the tool
+            
+        Returns:
+            An error result if the arguments are unusable, otherwise None
+        """
+        if not isinstance(args, dict):
+            return _NOT_A_DICT_RESULT.copy()
+        
+        validation = self.validate_args(args)
+        if validation["missing"]:
+            return {
+                "success": False,
+                "error": f"Missing required argument: {', '.join(validation['missing'])}"
+            }
+        if validation["invalid"]:
+            return {
+                "success": False,
+                "error": f"Argument must be an integer: {', '.join(validation['invalid'])}"
             }
-        ]
+        
+        return None
     
     def execute(self, args: Dict[str, Any], context: Optional[Dict[str, Any]] = None, working_dir: Optional[Union[str, Path]] = None) -> Dict[str, Any]:
         """
@@ -123,11 +843,9 @@ class TerminalCommandTool(SupernovaTool):
         Returns:
             Dictionary with execution results
         """
-        if not isinstance(args, dict):
-            return {
-                "success": False, 
-                "error": "Arguments must be a dictionary"
-            }
+        error = self._check_args(args)
+        if error is not None:
+            return error
             
         # Get the command from args
         command = args.get("command", "")
@@ -137,9 +855,9 @@ class TerminalCommandTool(SupernovaTool):
         # If working_dir is provided as a function parameter, it takes precedence
         effective_working_dir = working_dir if working_dir is not None else args_working_dir
             
-        return self.execute_command(command, explanation, effective_working_dir)
+        return self.execute_command(command, explanation, effective_working_dir, args.get("timeout"))
         
-    def execute_command(self, command: str, explanation: str = None, working_dir: Union[str, Path] = None) -> Dict[str, Any]:
+    def execute_command(self, command: str, explanation: str = None, working_dir: Union[str, Path] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
         """
         Execute a terminal command and return the result.
         
@@ -147,89 +865,178 @@ class TerminalCommandTool(SupernovaTool):
             command: The command to execute
             explanation: Optional explanation of what this command does
             working_dir: Optional directory to run the command in (str or Path)
+            timeout: Optional timeout in seconds (defaults to 30)
             
         Returns:
             Dictionary with command execution results
         """
         if not command:
+            return _NO_COMMAND_RESULT.copy()
+        
+        if timeout is None:
+            timeout = _DEFAULT_TIMEOUT
+        
+        # Determine working directory - os.fspath handles both string and Path
+        # objects without building an intermediate Path
+        cwd = os.fspath(working_dir) if working_dir else os.getcwd()
+        
+        self._show_command(command, explanation)
+        
+        # Checked once up front so every execution path reports it the same way
+        if not os.path.isdir(cwd):
             return {
                 "success": False,
-                "error": "No command provided"
+                "error": f"Working directory does not exist: {cwd}"
             }
         
-        # Determine working directory - handle both string and Path objects
-        if working_dir:
-            # Convert to Path if it's a string
-            if isinstance(working_dir, str):
-                cwd = Path(working_dir)
-            else:
-                cwd = working_dir
-            
-            # Convert to string for subprocess
-            cwd = str(cwd)
-        else:
-            cwd = os.getcwd()
-        
-        # Show execution information
-        if explanation:
-            console.print(Panel(f"[cyan]{explanation}[/cyan]\n\n[bold]Command:[/bold] {command}", title="Running Command"))
-        else:
-            console.print(Panel(f"[bold]Command:[/bold] {command}", title="Running Command"))
+        builtin = _run_builtin(command, cwd) if self.use_builtins else None
+        if builtin is not None:
+            return self._build_result(*builtin)
         
-        #console.print(f"Working directory: {cwd}")
+        # Simple commands are cheaper to execute directly than to hand to the
+        # pool; the pool runs /bin/sh, so bash-only commands keep their one-shot bash
+        pool = _get_shell_pool() if self.use_shell_pool else None
+        if (pool is not None and _direct_argv(command) is None
+                and _shell_executable(command) == _POSIX_SHELL
+                and not _BACKGROUND_RE.search(command)):
+            try:
+                pooled = pool.run(command, cwd, timeout)
+                if pooled is not None:
+                    return self._build_result(*pooled)
+            except subprocess.TimeoutExpired:
+                return _TIMEOUT_RESULT.copy()
+            except OSError:
+                # The pool could not start a shell; use a one-shot process
+                pass
+            except Exception as e:
+                _get_console().print(f"[red]Error executing command: {str(e)}[/red]")
+                return {
+                    "success": False,
+                    "error": f"Error executing command: {str(e)}"
+                }
         
+        process = None
         try:
             # Execute command
-            process = subprocess.Popen(
-                command,
-                cwd=cwd,
-                shell=True,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
+            process = _spawn(command, cwd)
             
             # Get output with timeout
-            stdout, stderr = process.communicate(timeout=30)
-            returncode = process.returncode
-            
-            if returncode == 0:
-                #console.print("[green]Command completed successfully[/green]")
-                if stdout:
-                    console.print(Panel(stdout, title="Output"))
-                return {
-                    "success": True,
-                    "stdout": stdout,
-                    "stderr": stderr,
-                    "code": returncode
-                }
-            else:
-                #console.print(f"[red]Command failed with exit code {returncode}[/red]")
-                if stderr:
-                    console.print(Panel(stderr, title="Error"))
-                if stdout:
-                    console.print(Panel(stdout, title="Output"))
-                return {
-                    "success": False,
-                    "error": f"Command failed with exit code {returncode}",
-                    "stdout": stdout,
-                    "stderr": stderr,
-                    "code": returncode
-                }
+            stdout, stderr = _communicate(process, timeout=timeout)
+            return self._build_result(process.returncode, stdout, stderr)
         except subprocess.TimeoutExpired:
             #console.print("[red]Command execution timed out[/red]")
-            process.kill()
+            _kill_process_group(process)
+            return _TIMEOUT_RESULT.copy()
+        except Exception as e:
+            if process is not None:
+                # Do not leave a running (or unreaped) child behind
+                _kill_process_group(process)
+            _get_console().print(f"[red]Error executing command: {str(e)}[/red]")
             return {
                 "success": False,
-                "error": "Command execution timed out"
+                "error": f"Error executing command: {str(e)}"
             }
+    
+    async def execute_command_async(self, command: str, explanation: str = None, working_dir: Union[str, Path] = None, timeout: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Execute a terminal command without blocking the event loop.
+        
+        Mirrors execute_command, but waits on the child through asyncio so
+        that concurrent tool calls can overlap their waits.
+        
+        Args:
+            command: The command to execute
+            explanation: Optional explanation of what this command does
+            working_dir: Optional directory to run the command in (str or Path)
+            timeout: Optional timeout in seconds (defaults to 30)
+            
+        Returns:
+            Dictionary with command execution results
+        """
+        if not command:
+            return _NO_COMMAND_RESULT.copy()
+        
+        if timeout is None:
+            timeout = _DEFAULT_TIMEOUT
+        
+        cwd = os.fspath(working_dir) if working_dir else os.getcwd()
+        
+        self._show_command(command, explanation)
+        
+        # Checked once up front so every execution path reports it the same way
+        if not os.path.isdir(cwd):
+            return {
+                "success": False,
+                "error": f"Working directory does not exist: {cwd}"
+            }
+        
+        builtin = _run_builtin(command, cwd) if self.use_builtins else None
+        if builtin is not None:
+            return self._build_result(*builtin)
+        
+        process = None
+        try:
+            process = await _spawn_async(command, cwd)
+            
+            try:
+                stdout, stderr = await asyncio.wait_for(process.communicate(), timeout=timeout)
+            except asyncio.TimeoutError:
+                _signal_process_group(process)
+                await process.wait()
+                return _TIMEOUT_RESULT.copy()
+            
+            return self._build_result(process.returncode, _decode(stdout), _decode(stderr))
         except Exception as e:
-            console.print(f"[red]Error executing command: {str(e)}[/red]")
+            if process is not None and process.returncode is None:
+                # Do not leave a running (or unreaped) child behind
+                _signal_process_group(process)
+                await process.wait()
+            _get_console().print(f"[red]Error executing command: {str(e)}[/red]")
             return {
                 "success": False,
                 "error": f"Error executing command: {str(e)}"
             }
     
+    def _show_command(self, command: str, explanation: Optional[str]) -> None:
+        """Display the command that is about to run."""
+        from rich.panel import Panel
+        
+        if explanation:
+            _get_console().print(Panel(f"[cyan]{explanation}[/cyan]\n\n[bold]Command:[/bold] {command}", title="Running Command"))
+        else:
+            _get_console().print(Panel(f"[bold]Command:[/bold] {command}", title="Running Command"))
+    
+    def _build_result(self, returncode: int, stdout: str, stderr: str) -> Dict[str, Any]:
+        """
+        Display a finished command's output and build the result dictionary.
+        
+        Args:
+            returncode: Exit code of the command
+            stdout: Decoded standard output
+            stderr: Decoded standard error
+            
+        Returns:
+            Dictionary with command execution results
+        """
+        if returncode == 0:
+            _print_output(stdout, "Output")
+            return {
+                "success": True,
+                "stdout": stdout,
+                "stderr": stderr,
+                "code": returncode
+            }
+        
+        _print_output(stderr, "Error")
+        _print_output(stdout, "Output")
+        return {
+            "success": False,
+            "error": f"Command failed with exit code {returncode}",
+            "stdout": stdout,
+            "stderr": stderr,
+            "code": returncode
+        }
+    
     async def execute_async(self, args: Dict[str, Any], context: Dict[str, Any] = None, working_dir: Union[str, Path] = None) -> Dict[str, Any]:
         """
         Execute the terminal command asynchronously.
@@ -242,13 +1049,11 @@ class TerminalCommandTool(SupernovaTool):
         Returns:
             Command results
         """
-        # Extract command from args
-        if not isinstance(args, dict):
-            return {
-                "success": False,
-                "error": "Arguments must be a dictionary"
-            }
+        error = self._check_args(args)
+        if error is not None:
+            return error
         
+        # Extract command from args
         command = args.get("command", "")
         explanation = args.get("explanation", "")
         
@@ -257,40 +1062,39 @@ class TerminalCommandTool(SupernovaTool):
         args_working_dir = args.get("working_dir")
         effective_working_dir = working_dir if working_dir is not None else args_working_dir
         
-        console.print(f"[dim]Async executing with working directory: {effective_working_dir}[/dim]")
+        _get_console().print(f"[dim]Async executing with working directory: {effective_working_dir}[/dim]")
         
         # Run the terminal command
-        return self.execute_command(
+        return await self.execute_command_async(
             command=command,
             explanation=explanation,
-            working_dir=effective_working_dir
+            working_dir=effective_working_dir,
+            timeout=args.get("timeout")
         )
     
+    async def execute_many(self, commands: List[str], working_dir: Union[str, Path] = None) -> List[Dict[str, Any]]:
+        """
+        Execute several independent commands concurrently.
+        
+        Useful for batches of quick probes (``git status``, ``ls`` ...) where
+        waiting on each child in turn would serialize the spawn latency.
+        
+        Args:
+            commands: Commands to execute
+            working_dir: Directory to run every command in
+            
+        Returns:
+            List of command results, in the same order as ``commands``
+        """
+        results = await asyncio.gather(*(
+            self.execute_command_async(command, working_dir=working_dir)
+            for command in commands
+        ))
+        return list(results)
+    
     def _is_potentially_dangerous(self, command: str) -> bool:
         """Check if a command contains potentially dangerous operations."""
-        # List of potentially dangerous command patterns
-        dangerous_patterns = [
-            r"rm\s+-rf\s+/",
-            r"rm\s+-rf\s+~",
-            r"rm\s+-rf\s+\*",
-            r":(){ :\|:& };:",
-            r"dd\s+.*\s+of=/dev/",
-            r">\s+/dev/",
-            r">\s+/proc/",
-            r">\s+/sys/",
-            r"shutdown",
-            r"mkfs",
-            r"reboot",
-            r"halt",
-            r"poweroff"
-        ]
-        
-        # Check if command matches any dangerous pattern
-        for pattern in dangerous_patterns:
-            if re.search(pattern, command, re.IGNORECASE):
-                return True
-        
-        return False
+        return _DANGEROUS_RE.search(command) is not None
 
     # Helper methods for compatibility with old code
     def get_name(self) -> str:
@@ -1,5 +1,3 @@
-import os
-import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
@@ -11,6 +9,22 @@ from supernova.core.llm_provider import LLMProvider
 from supernova.core.tool_manager import ToolManager
 
 
+def pytest_configure(config):
+    """Import the chat session once before collection to warm the import cache."""
+    import supernova.cli.chat_session  # noqa: F401
+
+
+def pytest_collection_modifyitems(config, items):
+    """Run tests marked slow last so fast failures surface first.
+    
+    The order is left alone when slow tests are selected explicitly or when
+    rerunning the last failures.
+    """
+    if "slow" in (config.getoption("markexpr") or "") or config.getoption("lf", False):
+        return
+    items.sort(key=lambda item: item.get_closest_marker("slow") is not None)
+
+
 @pytest.fixture
 def cli_runner():
     """Fixture for testing CLI commands."""
@@ -18,13 +32,10 @@ def cli_runner():
 
 
 @pytest.fixture
-def temp_dir():
-    """Create a temporary directory for tests."""
-    with tempfile.TemporaryDirectory() as tmpdir:
-        old_cwd = os.getcwd()
-        os.chdir(tmpdir)
-        yield Path(tmpdir)
-        os.chdir(old_cwd)
+def temp_dir(tmp_path, monkeypatch):
+    """Create a temporary directory for tests and make it the working directory."""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
 
 
 @pytest.fixture
@@ -49,11 +60,19 @@ def mock_config():
     )
 
 
-@pytest.fixture
-def mock_llm_provider():
-    """Create a mock LLM provider for testing."""
+@pytest.fixture(scope="module")
+def _shared_llm_provider():
+    """Create the spec'd LLM provider mock once per module."""
     provider = MagicMock(spec=LLMProvider)
     provider.get_completion = MagicMock()
+    return provider
+
+
+@pytest.fixture
+def mock_llm_provider(_shared_llm_provider):
+    """Return the module's mock LLM provider, reset for this test."""
+    provider = _shared_llm_provider
+    provider.reset_mock(return_value=True, side_effect=True)
     provider.get_completion.return_value = {"choices": [{"message": {"content": "Test response"}}]}
     return provider
 
@@ -69,4 +88,27 @@ def mock_tool_manager():
         mock_tool.execute.return_value = "Tool executed successfully"
         
         mock_load.return_value = {"test_tool": mock_tool}
-        yield ToolManager 
\ No newline at end of file
+        yield ToolManager 
+
+_RESOLVED_PATHS = {}
+
+
+@pytest.fixture
+def cached_path_resolve(monkeypatch):
+    """Memoize Path.resolve() for absolute paths across the tests that use it.
+    
+    Relative paths depend on the current directory, so they always go
+    through the real resolve().
+    """
+    original_resolve = Path.resolve
+    
+    def resolve(self, strict=False):
+        if strict or not self.is_absolute():
+            return original_resolve(self, strict=strict)
+        key = str(self)
+        resolved = _RESOLVED_PATHS.get(key)
+        if resolved is None:
+            resolved = _RESOLVED_PATHS[key] = original_resolve(self)
+        return resolved
+    
+    monkeypatch.setattr(Path, "resolve", resolve)
@@ -1,18 +1,143 @@
+import copy
 import json
 from pathlib import Path
+from types import MappingProxyType, SimpleNamespace
 from unittest.mock import patch, MagicMock, AsyncMock
 import time
 
 import pytest
 
-from supernova.cli.chat_session import ChatSession
+from supernova.cli import chat_session as _cs_mod
+from supernova.cli.chat_session import ChatSession, _format_json
+
+# Read-only chat history shared by the tests that load a previous chat
+_SAMPLE_HISTORY = (
+    MappingProxyType({"role": "user", "content": "Hello", "timestamp": 1234567890, "metadata": None}),
+    MappingProxyType({"role": "assistant", "content": "Hi there", "timestamp": 1234567891, "metadata": None}),
+)
+
+# Read-only previous messages passed to format_messages_for_llm
+_PREVIOUS_MESSAGES = (
+    MappingProxyType({"role": "user", "content": "Hello"}),
+    MappingProxyType({"role": "assistant", "content": "Hi there"}),
+)
+
+# Tool schemas and tool info returned by the mocked tool manager; tests must
+# not mutate these
+_MOCK_TOOLS = [
+    {
+        "type": "function",
+        "function": {
+            "name": "test_tool",
+            "description": "A test tool",
+            "parameters": {
+                "type": "object",
+                "properties": {
+                    "arg1": {"type": "string"}
+                },
+                "required": ["arg1"]
+            }
+        }
+    }
+]
+_MOCK_TOOL_INFO = [
+    {
+        "name": "test_tool",
+        "description": "A test tool",
+        "usage_examples": [{"description": "Example", "usage": "Usage"}],
+        "required_args": {"arg1": "A test argument"}
+    }
+]
 
 
-@pytest.fixture
-def mock_llm_provider():
-    """Create a mock LLM provider for testing."""
-    provider = MagicMock()
-    provider.get_completion = AsyncMock(return_value={
+# The test_tool call shared by the tool call tests; handle_tool_call only reads it
+_TOOL_ARGS_JSON = '{"arg1": "test_value"}'
+_TOOL_CALL = {
+    "id": "call_123",
+    "function": {
+        "name": "test_tool",
+        "arguments": _TOOL_ARGS_JSON
+    }
+}
+
+
+def _identity(value):
+    """Return value unchanged; the default sanitizer for the mock LLM provider."""
+    return value
+
+
+class _CallRecorder:
+    """Record calls and return a preset value, without MagicMock's setup cost.
+    
+    Calls are recorded as (args, kwargs) tuples. Only the parts of the Mock
+    API these tests use are provided.
+    """
+    
+    def __init__(self, return_value=None, side_effect=None):
+        self.return_value = return_value
+        self.side_effect = side_effect
+        self.call_args_list = []
+    
+    def __call__(self, *args, **kwargs):
+        self.call_args_list.append((args, kwargs))
+        if isinstance(self.side_effect, BaseException):
+            raise self.side_effect
+        if callable(self.side_effect):
+            return self.side_effect(*args, **kwargs)
+        return self.return_value
+    
+    @property
+    def called(self):
+        return bool(self.call_args_list)
+    
+    @property
+    def call_count(self):
+        return len(self.call_args_list)
+    
+    @property
+    def call_args(self):
+        return self.call_args_list[-1] if self.call_args_list else None
+    
+    def assert_called(self):
+        assert self.called, "Expected a call, got none"
+    
+    def assert_called_once(self):
+        assert self.call_count == 1, f"Expected 1 call, got {self.call_count}"
+    
+    def assert_not_called(self):
+        assert not self.called, f"Expected no calls, got {self.call_args_list}"
+    
+    def assert_called_with(self, *args, **kwargs):
+        assert self.call_args == (args, kwargs), f"Last call was {self.call_args}"
+    
+    def assert_called_once_with(self, *args, **kwargs):
+        self.assert_called_once()
+        self.assert_called_with(*args, **kwargs)
+
+
+class _AsyncCallRecorder(_CallRecorder):
+    """Awaitable variant of _CallRecorder."""
+    
+    async def __call__(self, *args, **kwargs):
+        return super().__call__(*args, **kwargs)
+
+
+class _ConsoleStub:
+    """Stand-in for the rich console that answers every input() with one reply."""
+    
+    def __init__(self, reply=""):
+        self.reply = reply
+    
+    def input(self, *args, **kwargs):
+        return self.reply
+    
+    def print(self, *args, **kwargs):
+        pass
+
+
+def _configure_llm_provider(provider):
+    """Set the default responses of the mock LLM provider."""
+    provider.get_completion = _AsyncCallRecorder(return_value={
         "choices": [
             {
                 "message": {
@@ -22,80 +147,177 @@ def mock_llm_provider():
             }
         ]
     })
-    provider.get_completion_stream = AsyncMock(return_value=[
+    provider.get_completion_stream = _AsyncCallRecorder(return_value=[
         {"choices": [{"delta": {"content": "Test"}}]},
         {"choices": [{"delta": {"content": " response"}}]},
         {"choices": [{"delta": {"content": "."}}]},
     ])
-    provider._sanitize_response_content = MagicMock(side_effect=lambda x: x)
+    provider._sanitize_response_content = _CallRecorder(side_effect=_identity)
+
+
+def _configure_db_manager(db_manager):
+    """Set the default responses of the mock database manager."""
+    db_manager.enabled = True
+    db_manager.add_message = _CallRecorder(return_value=1)
+    db_manager.get_chat_history = _CallRecorder(return_value=[])
+    db_manager.get_latest_chat_for_project = _CallRecorder(return_value=1)
+    db_manager.create_chat = _CallRecorder(return_value=1)
+
+
+@pytest.fixture(scope="module")
+def mock_llm_provider():
+    """Create a stub LLM provider for testing."""
+    provider = SimpleNamespace()
+    _configure_llm_provider(provider)
     return provider
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def mock_db_manager():
-    """Create a mock database manager for testing."""
-    db_manager = MagicMock()
-    db_manager.enabled = True
-    db_manager.add_message = MagicMock(return_value=1)
-    db_manager.get_chat_history = MagicMock(return_value=[])
-    db_manager.get_latest_chat_for_project = MagicMock(return_value=1)
-    db_manager.create_chat = MagicMock(return_value=1)
+    """Create a stub database manager for testing."""
+    db_manager = SimpleNamespace()
+    _configure_db_manager(db_manager)
     return db_manager
 
 
+@pytest.fixture(scope="module", autouse=True)
+def _patch_mkdir(request):
+    """Stop ChatSession from creating .supernova directories, once for the module."""
+    patcher = patch("pathlib.Path.mkdir")
+    patcher.start()
+    request.addfinalizer(patcher.stop)
+
+
+@pytest.fixture(scope="module", autouse=True)
+def _silence_console(request):
+    """Silence the chat session's console.print once for the module."""
+    patcher = patch.object(_cs_mod.console, "print")
+    patcher.start()
+    request.addfinalizer(patcher.stop)
+
+
+@pytest.fixture(scope="module")
+def _shared_chat_session(_patch_mkdir, mock_llm_provider, mock_db_manager):
+    """Create the ChatSession shared by the module, with its pristine attributes.
+    
+    Each xdist worker builds its own copy. --dist=loadfile keeps this module
+    on one worker, and the session touches no real paths, since /test/dir is
+    fake and Path.mkdir is patched.
+    """
+    with patch.object(_cs_mod.llm_provider, "get_provider", return_value=mock_llm_provider):
+        with patch("supernova.core.context_analyzer.analyze_project", return_value="Test project"):
+            session = ChatSession(db=mock_db_manager, initial_directory=Path("/test/dir"))
+            # Set chat_id to a test value
+            session.chat_id = 1
+            session.session_state = {
+                "cwd": "/test/dir",
+                "initial_directory": "/test/dir",
+                "executed_commands": [],
+                "used_tools": [],
+                "created_files": [],
+                "path_history": ["/test/dir"],
+                "last_command": None,
+                "LAST_ACTION_RESULT": None,
+                "start_time": time.time(),
+                "environment": {
+                    "os": "posix",
+                    "platform": "test_platform"
+                }
+            }
+            pristine_attrs = dict(vars(session))
+            pristine_state = copy.deepcopy(session.session_state)
+            yield session, pristine_attrs, pristine_state
+
+
+@pytest.fixture(autouse=True)
+def _reset_mocks(mock_llm_provider, mock_db_manager):
+    """Give the shared stubs fresh recorders with their default responses."""
+    _configure_llm_provider(mock_llm_provider)
+    _configure_db_manager(mock_db_manager)
+
+
 @pytest.fixture
-def chat_session(mock_llm_provider, mock_db_manager):
-    """Create a ChatSession for testing."""
-    with patch("supernova.cli.chat_session.llm_provider.get_provider", return_value=mock_llm_provider):
-        with patch("supernova.cli.chat_session.DatabaseManager", return_value=mock_db_manager):
-            with patch("supernova.core.context_analyzer.analyze_project", return_value="Test project"):
-                with patch("pathlib.Path.mkdir"):
-                    session = ChatSession(cwd=Path("/test/dir"))
-                    # Directly set the db attribute to the mock
-                    session.db = mock_db_manager
-                    # Set chat_id to a test value
-                    session.chat_id = 1
-                    session.session_state = {
-                        "cwd": "/test/dir",
-                        "initial_directory": "/test/dir",
-                        "executed_commands": [],
-                        "used_tools": [],
-                        "created_files": [],
-                        "path_history": ["/test/dir"],
-                        "last_command": None,
-                        "LAST_ACTION_RESULT": None,
-                        "start_time": time.time(),
-                        "environment": {
-                            "os": "posix",
-                            "platform": "test_platform"
-                        }
-                    }
-                    yield session
-
-
-def test_chat_session_init():
-    """Test ChatSession initialization."""
-    with patch("supernova.cli.chat_session.llm_provider.get_provider") as mock_provider:
-        with patch("supernova.cli.chat_session.DatabaseManager") as mock_db:
-            with patch("supernova.core.context_analyzer.analyze_project") as mock_analyze:
-                with patch("pathlib.Path.mkdir") as mock_mkdir:
-                    # Set up mocks
-                    mock_provider.return_value = MagicMock()
-                    mock_db.return_value = MagicMock()
-                    mock_analyze.return_value = "Test project"
-                    
-                    # Initialize ChatSession
-                    cwd = Path("/test/dir")
-                    session = ChatSession(cwd=cwd)
-                    
-                    # Verify that the session was initialized correctly
-                    assert session.cwd == cwd
-                    assert session.initial_directory == cwd
-                    mock_provider.assert_called_once()
-                    mock_db.assert_called_once()
-
-
-@pytest.mark.asyncio
+def chat_session(_shared_chat_session):
+    """Return the shared ChatSession, reset to its pristine state for this test.
+    
+    Attributes a test set or replaced on the session are dropped, and the
+    messages and session state are rebuilt.
+    """
+    session, pristine_attrs, pristine_state = _shared_chat_session
+    vars(session).clear()
+    vars(session).update(pristine_attrs)
+    session.messages = []
+    session.session_state = copy.deepcopy(pristine_state)
+    return session
+
+
+@pytest.mark.parametrize("case,db_enabled,latest_chat_id,history,loaded_previous,expected_messages", [
+    (None, True, None, (), False, []),
+    ("new", True, None, (), False, []),
+    ("existing", True, 1, _SAMPLE_HISTORY, True, [("user", "Hello"), ("assistant", "Hi there")]),
+    ("db_disabled", False, None, (), False, []),
+], ids=["init", "new", "existing", "db_disabled"])
+async def test_chat_session_init(monkeypatch, mock_llm_provider, mock_db_manager, case, db_enabled,
+                                 latest_chat_id, history, loaded_previous, expected_messages):
+    """Test ChatSession initialization, then loading or creating a chat.
+    
+    The "init" case stops after the initialization checks.
+    """
+    # Set up mocks; monkeypatch undoes them all at teardown
+    mock_provider = MagicMock(return_value=mock_llm_provider)
+    mock_db = MagicMock(return_value=mock_db_manager)
+    monkeypatch.setattr(_cs_mod.llm_provider, "get_provider", mock_provider)
+    # ChatSession imports DatabaseManager when it builds the database
+    monkeypatch.setattr("supernova.persistence.db_manager.DatabaseManager", mock_db)
+    monkeypatch.setattr("supernova.core.context_analyzer.analyze_project", MagicMock(return_value="Test project"))
+    
+    # Initialize ChatSession
+    cwd = Path("/test/dir")
+    session = ChatSession(initial_directory=cwd)
+    
+    # Verify that the session was initialized correctly
+    assert session.cwd == cwd
+    assert session.initial_directory == cwd
+    assert session.llm_provider is mock_llm_provider
+    assert session.db is mock_db_manager
+    mock_provider.assert_called_once()
+    mock_db.assert_called_once()
+    
+    if case is None:
+        return
+    
+    mock_db_manager.enabled = db_enabled
+    mock_db_manager.get_latest_chat_for_project.return_value = latest_chat_id
+    mock_db_manager.get_chat_history.return_value = history
+    
+    # Call load_or_create_chat
+    await session.load_or_create_chat()
+    
+    if not db_enabled:
+        # Verify that no DB methods were called
+        mock_db_manager.get_latest_chat_for_project.assert_not_called()
+        mock_db_manager.get_chat_history.assert_not_called()
+        mock_db_manager.create_chat.assert_not_called()
+        return
+    
+    # Verify get_latest_chat_for_project was called with the correct path
+    mock_db_manager.get_latest_chat_for_project.assert_called_once_with(session.cwd)
+    
+    # Check the messages that were loaded
+    assert [(m["role"], m["content"]) for m in session.messages] == expected_messages
+    
+    # Check that session state was updated
+    assert session.session_state["loaded_previous_chat"] is loaded_previous
+    
+    if loaded_previous:
+        # Verify the history was read for the existing chat
+        mock_db_manager.get_chat_history.assert_called_once_with(latest_chat_id)
+        assert session.session_state["previous_message_count"] == len(history)
+    else:
+        # Verify a new chat was created
+        mock_db_manager.create_chat.assert_called_once_with(session.cwd)
+
+
 async def test_analyze_project(chat_session):
     """Test analyzing the project context."""
     with patch("supernova.core.context_analyzer.analyze_project") as mock_analyze:
@@ -114,7 +336,6 @@ async def test_analyze_project(chat_session):
         assert chat_session.session_state["project_summary"] == "Detailed project analysis"
 
 
-@pytest.mark.asyncio
 async def test_analyze_project_error(chat_session):
     """Test handling errors during project analysis."""
     with patch("supernova.core.context_analyzer.analyze_project") as mock_analyze:
@@ -132,168 +353,58 @@ async def test_analyze_project_error(chat_session):
         assert "Analysis error" in chat_session.session_state["project_error"]
 
 
-@pytest.mark.asyncio
-async def test_load_or_create_chat_existing(chat_session, mock_db_manager):
-    """Test loading an existing chat."""
-    # Mock get_chat_history to return some messages
-    messages = [
-        {"role": "user", "content": "Hello", "timestamp": 1234567890, "metadata": None},
-        {"role": "assistant", "content": "Hi there", "timestamp": 1234567891, "metadata": None}
-    ]
-    mock_db_manager.get_chat_history.return_value = messages
-    
-    # Call load_or_create_chat
-    await chat_session.load_or_create_chat()
-    
-    # Verify get_latest_chat_for_project was called with the correct path
-    mock_db_manager.get_latest_chat_for_project.assert_called_once_with(chat_session.cwd)
-    
-    # Verify get_chat_history was called with the correct chat ID
-    mock_db_manager.get_chat_history.assert_called_once_with(1)
-    
-    # Check that the messages were loaded correctly
-    assert len(chat_session.messages) == 2
-    assert chat_session.messages[0]["role"] == "user"
-    assert chat_session.messages[0]["content"] == "Hello"
-    assert chat_session.messages[1]["role"] == "assistant"
-    assert chat_session.messages[1]["content"] == "Hi there"
-    
-    # Check that session state was updated
-    assert chat_session.session_state["loaded_previous_chat"] is True
-    assert chat_session.session_state["previous_message_count"] == 2
-
-
-@pytest.mark.asyncio
-async def test_load_or_create_chat_new(chat_session, mock_db_manager):
-    """Test creating a new chat when no existing chat is found."""
-    # Mock get_latest_chat_for_project to return None (no existing chat)
-    mock_db_manager.get_latest_chat_for_project.return_value = None
-    
-    # Call load_or_create_chat
-    await chat_session.load_or_create_chat()
-    
-    # Verify get_latest_chat_for_project was called
-    mock_db_manager.get_latest_chat_for_project.assert_called_once_with(chat_session.cwd)
-    
-    # Verify create_chat was called
-    mock_db_manager.create_chat.assert_called_once_with(chat_session.cwd)
-    
-    # Check that no messages were loaded
-    assert len(chat_session.messages) == 0
-    
-    # Check that session state was updated
-    assert chat_session.session_state["loaded_previous_chat"] is False
-
-
-@pytest.mark.asyncio
-async def test_load_or_create_chat_db_disabled(chat_session, mock_db_manager):
-    """Test behavior when database is disabled."""
-    # Disable the database
-    mock_db_manager.enabled = False
-    
-    # Call load_or_create_chat
-    await chat_session.load_or_create_chat()
-    
-    # Verify that no DB methods were called
-    mock_db_manager.get_latest_chat_for_project.assert_not_called()
-    mock_db_manager.get_chat_history.assert_not_called()
-    mock_db_manager.create_chat.assert_not_called()
-
-
-def test_add_message(chat_session, mock_db_manager):
-    """Test adding a message to the chat history."""
-    # Remove the mock to use the real method
-    chat_session.add_message = chat_session.__class__.add_message.__get__(chat_session, chat_session.__class__)
+@pytest.mark.parametrize("role,content,metadata,db_error,expected_content", [
+    ("user", "Test message", None, False, "Test message"),
+    ("assistant", "Test response", {"test_key": "test_value"}, False, "Test response"),
+    ("user", "Test message", None, True, "Test message"),
+    ("user", 123, None, False, "123"),
+], ids=["plain", "metadata", "db_error", "non_string"])
+def test_add_message(chat_session, mock_db_manager, role, content,
+                     metadata, db_error, expected_content):
+    """Test adding a message to the chat history and the database."""
+    if db_error:
+        # Make the database add_message method raise an exception
+        mock_db_manager.add_message.side_effect = Exception("Database error")
     
-    # Add a message
-    chat_session.add_message("user", "Test message")
+    # Add the message; a database error should only print a warning
+    if metadata is None:
+        chat_session.add_message(role, content)
+    else:
+        chat_session.add_message(role, content, metadata)
     
-    # Check that the message was added to the in-memory history
+    # Check that the message was added to the in-memory history, with
+    # non-string content converted to a string
     assert len(chat_session.messages) == 1
-    assert chat_session.messages[0]["role"] == "user"
-    assert chat_session.messages[0]["content"] == "Test message"
-    
-    # Check that the message was added to the database
-    mock_db_manager.add_message.assert_called_once()
-    args = mock_db_manager.add_message.call_args[0]
-    assert args[0] == chat_session.chat_id
-    assert args[1] == "user"
-    assert args[2] == "Test message"
+    assert chat_session.messages[0]["role"] == role
+    assert chat_session.messages[0]["content"] == expected_content
+    if metadata is not None:
+        assert chat_session.messages[0]["metadata"] == metadata
     
-    # Check that the session state was updated
-    assert chat_session.session_state["last_user_message"] == "Test message"
-
-
-def test_add_message_with_metadata(chat_session, mock_db_manager):
-    """Test adding a message with metadata."""
-    # Remove the mock to use the real method
-    chat_session.add_message = chat_session.__class__.add_message.__get__(chat_session, chat_session.__class__)
-    
-    # Add a message with metadata
-    metadata = {"test_key": "test_value"}
-    chat_session.add_message("assistant", "Test response", metadata)
-    
-    # Check that the message was added to the in-memory history
-    assert len(chat_session.messages) == 1
-    assert chat_session.messages[0]["role"] == "assistant"
-    assert chat_session.messages[0]["content"] == "Test response"
-    assert chat_session.messages[0]["metadata"] == metadata
+    if db_error or not isinstance(content, str):
+        return
     
-    # Check that the message was added to the database with metadata
+    # Check that the message was added to the database
     mock_db_manager.add_message.assert_called_once()
     args = mock_db_manager.add_message.call_args[0]
     assert args[0] == chat_session.chat_id
-    assert args[1] == "assistant"
-    assert args[2] == "Test response"
-    assert args[3] == metadata
-
-
-def test_add_message_db_error(chat_session, mock_db_manager):
-    """Test handling errors when adding a message to the database."""
-    # Remove the mock to use the real method
-    chat_session.add_message = chat_session.__class__.add_message.__get__(chat_session, chat_session.__class__)
+    assert args[1] == role
+    assert args[2] == content
+    if metadata is not None:
+        assert args[3] == metadata
     
-    # Make the database add_message method raise an exception
-    mock_db_manager.add_message.side_effect = Exception("Database error")
-    
-    # This should not raise an exception, but just print a warning
-    chat_session.add_message("user", "Test message")
-    
-    # Check that the message was still added to the in-memory history
-    assert len(chat_session.messages) == 1
-    assert chat_session.messages[0]["role"] == "user"
-    assert chat_session.messages[0]["content"] == "Test message"
-
-
-def test_add_message_non_string_content(chat_session):
-    """Test adding a message with non-string content."""
-    # Remove the mock to use the real method
-    chat_session.add_message = chat_session.__class__.add_message.__get__(chat_session, chat_session.__class__)
-    
-    # Add a message with non-string content
-    chat_session.add_message("user", 123)
-    
-    # Check that the message was added with the content converted to a string
-    assert len(chat_session.messages) == 1
-    assert chat_session.messages[0]["role"] == "user"
-    assert chat_session.messages[0]["content"] == "123"
+    if role == "user":
+        # Check that the session state was updated
+        assert chat_session.session_state["last_user_message"] == content
 
 
-@pytest.mark.asyncio
 async def test_format_messages_for_llm(chat_session):
     """Test formatting messages for the LLM API call."""
-    # Add some previous messages
-    previous_messages = [
-        {"role": "user", "content": "Hello"},
-        {"role": "assistant", "content": "Hi there"}
-    ]
-    
     # Call format_messages_for_llm
     messages, tools, tool_choice = await chat_session.format_messages_for_llm(
         content="How are you?",
         system_prompt="You are a helpful assistant.",
         context_msg="Project context: test project",
-        previous_messages=previous_messages,
+        previous_messages=_PREVIOUS_MESSAGES,
         include_tools=False
     )
     
@@ -319,134 +430,101 @@ async def test_format_messages_for_llm(chat_session):
     assert tool_choice is None
 
 
-@pytest.mark.asyncio
 async def test_format_messages_for_llm_with_tools(chat_session):
     """Test formatting messages for the LLM API call with tools."""
-    # Mock the tool manager
-    with patch.object(chat_session, 'tool_manager') as mock_tool_manager:
-        # Mock get_available_tools_for_llm to return some tools
-        mock_tools = [
-            {
-                "type": "function",
-                "function": {
-                    "name": "test_tool",
-                    "description": "A test tool",
-                    "parameters": {
-                        "type": "object",
-                        "properties": {
-                            "arg1": {"type": "string"}
-                        },
-                        "required": ["arg1"]
-                    }
-                }
-            }
-        ]
-        mock_tool_manager.get_available_tools_for_llm = AsyncMock(return_value=mock_tools)
-        
-        # Add some previous messages
-        previous_messages = [
-            {"role": "user", "content": "Hello"},
-            {"role": "assistant", "content": "Hi there"}
-        ]
-        
-        # Call format_messages_for_llm with include_tools=True
-        messages, tools, tool_choice = await chat_session.format_messages_for_llm(
-            content="Use the test tool",
-            system_prompt="You are a helpful assistant.",
-            context_msg="Project context: test project",
-            previous_messages=previous_messages,
-            include_tools=True
-        )
-        
-        # Check the result
-        assert isinstance(messages, list)
-        
-        # Check that the system message was combined correctly
-        assert messages[0]["role"] == "system"
-        assert messages[0]["content"] == "You are a helpful assistant.\n\nProject context: test project"
-        
-        # Check that previous messages were included
-        assert messages[1]["role"] == "user"
-        assert messages[1]["content"] == "Hello"
-        assert messages[2]["role"] == "assistant"
-        assert messages[2]["content"] == "Hi there"
-        
-        # Check that the new user message was added
-        assert messages[3]["role"] == "user"
-        assert messages[3]["content"] == "Use the test tool"
-        
-        # Check that tools were included
-        assert tools == mock_tools
-        assert tool_choice == "auto"
-        
-        # Verify that get_available_tools_for_llm was called
-        mock_tool_manager.get_available_tools_for_llm.assert_called_once_with(chat_session.session_state)
+    # Replace the tool manager; the chat_session fixture restores it.
+    # Mock get_available_tools_for_llm to return some tools
+    mock_tool_manager = chat_session.tool_manager = SimpleNamespace(
+        get_available_tools_for_llm=AsyncMock(return_value=_MOCK_TOOLS)
+    )
+    
+    # Call format_messages_for_llm with include_tools=True
+    messages, tools, tool_choice = await chat_session.format_messages_for_llm(
+        content="Use the test tool",
+        system_prompt="You are a helpful assistant.",
+        context_msg="Project context: test project",
+        previous_messages=_PREVIOUS_MESSAGES,
+        include_tools=True
+    )
+    
+    # Check the result
+    assert isinstance(messages, list)
+    
+    # Check that the system message was combined correctly
+    assert messages[0]["role"] == "system"
+    assert messages[0]["content"] == "You are a helpful assistant.\n\nProject context: test project"
+    
+    # Check that previous messages were included
+    assert messages[1]["role"] == "user"
+    assert messages[1]["content"] == "Hello"
+    assert messages[2]["role"] == "assistant"
+    assert messages[2]["content"] == "Hi there"
+    
+    # Check that the new user message was added
+    assert messages[3]["role"] == "user"
+    assert messages[3]["content"] == "Use the test tool"
+    
+    # Check that tools were included
+    assert tools == _MOCK_TOOLS
+    assert tool_choice == "auto"
+    
+    # Verify that get_available_tools_for_llm was called
+    mock_tool_manager.get_available_tools_for_llm.assert_called_once_with(chat_session.session_state)
 
 
-@pytest.mark.asyncio
 async def test_get_available_tools_info(chat_session):
     """Test getting information about available tools."""
-    # Mock the tool manager
-    with patch.object(chat_session, 'tool_manager') as mock_tool_manager:
-        # Mock get_tool_info to return some tool info
-        mock_tool_info = [
-            {
-                "name": "test_tool",
-                "description": "A test tool",
-                "usage_examples": [{"description": "Example", "usage": "Usage"}],
-                "required_args": {"arg1": "A test argument"}
-            }
-        ]
-        mock_tool_manager.get_tool_info_async = AsyncMock(return_value=mock_tool_info)
-        
-        # Call get_available_tools_info
-        result = await chat_session.get_available_tools_info()
-        
-        # Check the result
-        assert isinstance(result, str)
-        assert "test_tool" in result
-        assert "A test tool" in result
-        assert "Example" in result or "Usage" in result
-        assert "arg1" in result
-        
-        # Verify that get_tool_info_async was called
-        mock_tool_manager.get_tool_info_async.assert_called_once()
+    # Replace the tool manager; the chat_session fixture restores it.
+    # Mock get_tool_info to return some tool info
+    mock_tool_manager = chat_session.tool_manager = SimpleNamespace(
+        get_tool_info_async=AsyncMock(return_value=_MOCK_TOOL_INFO)
+    )
+    
+    # Call get_available_tools_info
+    result = await chat_session.get_available_tools_info()
+    
+    # Check the result
+    assert isinstance(result, str)
+    assert "test_tool" in result
+    assert "A test tool" in result
+    assert "Example" in result or "Usage" in result
+    assert "arg1" in result
+    
+    # Verify that get_tool_info_async was called
+    mock_tool_manager.get_tool_info_async.assert_called_once()
 
 
-@pytest.mark.asyncio
 async def test_get_available_tools_info_no_tools(chat_session):
     """Test getting information about available tools when none are available."""
-    # Mock the tool manager
-    with patch.object(chat_session, 'tool_manager') as mock_tool_manager:
-        # Mock get_tool_info to return an empty list
-        mock_tool_manager.get_tool_info_async = AsyncMock(return_value=[])
-        
-        # Call get_available_tools_info
-        result = await chat_session.get_available_tools_info()
-        
-        # Check the result
-        assert isinstance(result, str)
-        assert "No tools available" in result
-        
-        # Verify that get_tool_info was called
-        mock_tool_manager.get_tool_info_async.assert_called_once()
+    # Replace the tool manager; the chat_session fixture restores it.
+    # Mock get_tool_info to return an empty list
+    mock_tool_manager = chat_session.tool_manager = SimpleNamespace(
+        get_tool_info_async=AsyncMock(return_value=[])
+    )
+    
+    # Call get_available_tools_info
+    result = await chat_session.get_available_tools_info()
+    
+    # Check the result
+    assert isinstance(result, str)
+    assert "No tools available" in result
+    
+    # Verify that get_tool_info was called
+    mock_tool_manager.get_tool_info_async.assert_called_once()
 
 
-@pytest.mark.asyncio
-@patch("prompt_toolkit.prompt")
-@patch("supernova.cli.chat_session.console")
-async def test_get_user_input(mock_console, mock_prompt, chat_session):
+async def test_get_user_input(mocker, chat_session):
     """Test getting user input."""
     # Mock the built-in input function instead of prompt_toolkit
-    with patch('builtins.input', return_value="Test input"):
-        # Call get_user_input (which is async)
-        user_input = await chat_session.get_user_input()
-        
-        # Check the result
-        assert user_input == "Test input"
+    mocker.patch("builtins.input", return_value="Test input")
+    
+    # Call get_user_input (which is async)
+    user_input = await chat_session.get_user_input()
+    
+    # Check the result
+    assert user_input == "Test input"
 
 
-@pytest.mark.asyncio
 async def test_get_context_message(chat_session):
     """Test getting the context message."""
     # Mock the tool_manager.list_tools_async method to avoid errors
@@ -460,16 +538,15 @@ async def test_get_context_message(chat_session):
         assert "Initial directory" in context
 
 
-@patch("supernova.cli.chat_session.console")
-def test_handle_terminal_command_success(mock_console, chat_session):
+def test_handle_terminal_command_success(monkeypatch, chat_session):
     """Test handling a successful terminal command."""
+    # Simulate user confirmation through console.input
+    monkeypatch.setattr(_cs_mod, "console", _ConsoleStub("y"))
+    
     # Set up mock for command_runner.run_command
-    with patch("supernova.cli.chat_session.command_runner") as mock_command_runner:
+    with patch.object(_cs_mod, "command_runner") as mock_command_runner:
         mock_command_runner.run_command.return_value = (0, "Command output", "")
         
-        # Mock prompt to simulate user confirmation using the built-in console.input
-        mock_console.input.return_value = "y"
-        
         # Mock the add_message method to check if it's called
         with patch.object(chat_session, 'add_message') as mock_add_message:
             # Create args dictionary for terminal command
@@ -495,11 +572,10 @@ def test_handle_terminal_command_success(mock_console, chat_session):
             assert call_found, "No matching add_message call found for successful command execution"
 
 
-@patch("supernova.cli.chat_session.console")
-def test_handle_terminal_command_user_rejection(mock_console, chat_session):
+def test_handle_terminal_command_user_rejection(monkeypatch, chat_session):
     """Test handling a terminal command that the user rejects."""
-    # Mock the console.input method to return "n"
-    mock_console.input.return_value = "n"
+    # Simulate the user answering "n" through console.input
+    monkeypatch.setattr(_cs_mod, "console", _ConsoleStub("n"))
     
     # Mock the add_message method to check if it's called
     with patch.object(chat_session, 'add_message') as mock_add_message:
@@ -516,8 +592,7 @@ def test_handle_terminal_command_user_rejection(mock_console, chat_session):
         assert "cancelled" in args[1]
 
 
-@pytest.mark.asyncio
-@patch("supernova.cli.chat_session.console")
+@patch.object(_cs_mod, "console")
 async def test_send_to_llm(mock_console, chat_session, mock_llm_provider):
     """Test sending a message to the LLM."""
     # Call send_to_llm
@@ -533,8 +608,8 @@ async def test_send_to_llm(mock_console, chat_session, mock_llm_provider):
     assert response["choices"][0]["message"]["content"] == "Test response"
 
 
-@pytest.mark.asyncio
-@patch("supernova.cli.chat_session.console")
+@pytest.mark.slow
+@patch.object(_cs_mod, "console")
 async def test_process_llm_response_with_command(mock_console, chat_session):
     """Test processing an LLM response with a terminal command."""
     # Create a mock response with content
@@ -589,8 +664,8 @@ async def test_process_llm_response_with_command(mock_console, chat_session):
                 chat_session.process_llm_response = original_method
 
 
-@pytest.mark.asyncio
-@patch("supernova.cli.chat_session.console")
+@pytest.mark.slow
+@patch.object(_cs_mod, "console")
 async def test_run_exits_on_exit_command(mock_console, chat_session):
     """Test that the run method exits when the user types 'exit'."""
     # Mock read_input to return 'exit'
@@ -602,85 +677,42 @@ async def test_run_exits_on_exit_command(mock_console, chat_session):
         assert not chat_session.llm_provider.get_completion.called
 
 
-@pytest.mark.asyncio
-async def test_handle_tool_call(chat_session):
-    """Test handling tool calls from the LLM."""
-    # Mock the tool manager's execute_tool method
+@pytest.mark.parametrize("arguments,execute_result,expected_success,expected_result", [
+    (_TOOL_ARGS_JSON, "Tool execution result", True, "Tool execution result"),
+    (_TOOL_ARGS_JSON, Exception("Tool execution error"), False, "Tool execution error"),
+    ("{invalid json", None, False, "Invalid JSON"),
+], ids=["success", "error", "invalid_json"])
+async def test_handle_tool_call(chat_session, arguments, execute_result, expected_success,
+                                expected_result):
+    """Test handling tool calls from the LLM, including failing and malformed calls."""
+    tool_call = {**_TOOL_CALL, "function": {"name": "test_tool", "arguments": arguments}}
+    
+    # Mock the tool manager's execute_tool method to return or raise
     with patch.object(chat_session.tool_manager, 'execute_tool') as mock_execute_tool:
-        mock_execute_tool.return_value = "Tool execution result"
-
-        # Create a mock tool call
-        tool_call = {
-            "id": "call_123",
-            "function": {
-                "name": "test_tool",
-                "arguments": json.dumps({"arg1": "test_value"})
-            }
-        }
-
+        if isinstance(execute_result, Exception):
+            mock_execute_tool.side_effect = execute_result
+        else:
+            mock_execute_tool.return_value = execute_result
+        
         # Call handle_tool_call
         result = await chat_session.handle_tool_call(tool_call)
-
+    
+    if expected_success:
         # Verify execute_tool was called with the right arguments
         mock_execute_tool.assert_called_once_with(
             "test_tool",
             {"arg1": "test_value"},
             session_state=chat_session.session_state
         )
-
-        # Check the result indicates success
-        assert result["success"] is True
-        assert result["result"] == "Tool execution result"
-        assert result["name"] == "test_tool"
-
-
-@pytest.mark.asyncio
-async def test_handle_tool_call_error(chat_session):
-    """Test handling errors during tool call execution."""
-    # Mock the tool manager's execute_tool method to raise an exception
-    with patch.object(chat_session.tool_manager, 'execute_tool') as mock_execute_tool:
-        mock_execute_tool.side_effect = Exception("Tool execution error")
-
-        # Create a mock tool call
-        tool_call = {
-            "id": "call_123",
-            "function": {
-                "name": "test_tool",
-                "arguments": json.dumps({"arg1": "test_value"})
-            }
-        }
-
-        # Call handle_tool_call
-        result = await chat_session.handle_tool_call(tool_call)
-
-        # Check the result indicates an error
-        assert result["success"] is False
-        assert "Tool execution error" in result["result"]
-        assert result["name"] == "test_tool"
-
-
-@pytest.mark.asyncio
-async def test_handle_tool_call_invalid_json(chat_session):
-    """Test handling tool calls with invalid JSON arguments."""
-    # Create a mock tool call with invalid JSON
-    tool_call = {
-        "id": "call_123",
-        "function": {
-            "name": "test_tool",
-            "arguments": "{invalid json"
-        }
-    }
+        assert result["result"] == expected_result
+    else:
+        assert expected_result in result["result"]
     
-    # Call handle_tool_call
-    result = await chat_session.handle_tool_call(tool_call)
-    
-    # Check the result indicates an error
-    assert result["success"] is False
-    assert "Invalid JSON" in result["result"]
+    # Check the result indicates success or failure
+    assert result["success"] is expected_success
     assert result["name"] == "test_tool"
 
 
-@pytest.mark.asyncio
 async def test_process_llm_response_with_tool_calls(chat_session):
     """Test processing an LLM response with tool calls."""
     # Mock handle_tool_call
@@ -698,15 +730,7 @@ async def test_process_llm_response_with_tool_calls(chat_session):
                     "message": {
                         "role": "assistant",
                         "content": None,
-                        "tool_calls": [
-                            {
-                                "id": "call_123",
-                                "function": {
-                                    "name": "test_tool",
-                                    "arguments": json.dumps({"arg1": "test_value"})
-                                }
-                            }
-                        ]
+                        "tool_calls": [_TOOL_CALL]
                     }
                 }
             ]
@@ -774,79 +798,58 @@ def test_extract_files_from_response(chat_session):
     assert files_unclosed[0]["language"] == "python"
 
 
-@pytest.mark.asyncio
-async def test_send_to_llm_with_streaming(chat_session, mock_llm_provider):
+async def test_send_to_llm_with_streaming(mocker, chat_session, mock_llm_provider):
     """Test sending a message to the LLM with streaming enabled."""
     # Setup streaming response
     stream_response = {"choices": [{"delta": {"content": "Streaming test"}}]}
     mock_llm_provider.get_completion.return_value = stream_response
     
     # Mock _reset_streaming_state and handle_stream_chunk
-    with patch.object(chat_session, '_reset_streaming_state') as mock_reset:
-        with patch.object(chat_session, 'handle_stream_chunk') as mock_handle:
-            with patch("supernova.cli.chat_session.console.print"):
-                # Call send_to_llm with streaming enabled
-                response = await chat_session.send_to_llm("Test message", stream=True)
-                
-                # Verify reset_streaming_state was called
-                mock_reset.assert_called_once()
-                
-                # Verify get_completion was called with stream=True
-                mock_llm_provider.get_completion.assert_called_once()
-                call_args = mock_llm_provider.get_completion.call_args[1]
-                assert call_args["stream"] is True
-                assert call_args["stream_callback"] == chat_session.handle_stream_chunk
-                
-                # Verify response is as expected
-                assert response == stream_response
-
-
-@pytest.mark.asyncio
-async def test_process_llm_response_with_string(chat_session, mock_llm_provider):
-    """Test processing a string LLM response."""
-    # Setup the mock to return a specific value for this test
-    mock_llm_provider._sanitize_response_content.side_effect = lambda x: x
-    
-    # Test with a string response
-    response = "This is a test response"
+    mock_reset = mocker.patch.object(chat_session, '_reset_streaming_state')
+    mocker.patch.object(chat_session, 'handle_stream_chunk')
     
-    processed = await chat_session.process_llm_response(response)
+    # Call send_to_llm with streaming enabled
+    response = await chat_session.send_to_llm("Test message", stream=True)
     
-    # Check the processed response
-    assert processed["content"] == "This is a test response"
-    assert processed["tool_results"] == []
+    # Verify reset_streaming_state was called
+    mock_reset.assert_called_once()
     
-    # Verify the sanitize method was called with the right content
-    mock_llm_provider._sanitize_response_content.assert_called_with(response)
-
-
-@pytest.mark.asyncio
-async def test_process_llm_response_with_dict(chat_session, mock_llm_provider):
-    """Test processing a dictionary LLM response."""
-    # Setup the mock to return a specific value for this test
-    mock_llm_provider._sanitize_response_content.side_effect = lambda x: x
+    # Verify get_completion was called with stream=True
+    mock_llm_provider.get_completion.assert_called_once()
+    call_args = mock_llm_provider.get_completion.call_args[1]
+    assert call_args["stream"] is True
+    assert call_args["stream_callback"] == chat_session.handle_stream_chunk
     
-    # Test with a dictionary response
-    response = {
-        "content": "This is a test response from a dict"
-    }
+    # Verify response is as expected
+    assert response == stream_response
+
+
+@pytest.mark.parametrize("response,sanitize_error,expected_content,expected_sanitize_arg", [
+    ("This is a test response", None, "This is a test response", "This is a test response"),
+    ({"content": "This is a test response from a dict"}, None,
+     "This is a test response from a dict", "This is a test response from a dict"),
+    # The sanitize mock raises, so an error response comes back
+    ("This will trigger an error due to our mock", Exception("Test error"),
+     "Error processing LLM response", "This will trigger an error due to our mock"),
+], ids=["string", "dict", "error"])
+async def test_process_llm_response_content(chat_session, mock_llm_provider, response,
+                                            sanitize_error, expected_content, expected_sanitize_arg):
+    """Test processing a string, dictionary or failing LLM response."""
+    if sanitize_error is not None:
+        mock_llm_provider._sanitize_response_content.side_effect = sanitize_error
     
     processed = await chat_session.process_llm_response(response)
     
     # Check the processed response
-    assert processed["content"] == "This is a test response from a dict"
+    assert processed["content"] == expected_content
     assert processed["tool_results"] == []
     
     # Verify the sanitize method was called with the right content
-    mock_llm_provider._sanitize_response_content.assert_called_with("This is a test response from a dict")
+    mock_llm_provider._sanitize_response_content.assert_called_with(expected_sanitize_arg)
 
 
-@pytest.mark.asyncio
 async def test_process_llm_response_with_tool_calls(chat_session, mock_llm_provider):
     """Test processing an LLM response with tool calls."""
-    # Setup sanitize mock
-    mock_llm_provider._sanitize_response_content.side_effect = lambda x: x
-    
     # Mock handle_tool_call to return a test result
     with patch.object(chat_session, 'handle_tool_call') as mock_handle_tool_call:
         mock_handle_tool_call.return_value = {
@@ -858,15 +861,7 @@ async def test_process_llm_response_with_tool_calls(chat_session, mock_llm_provi
         # Create a response with tool calls in dict format
         response = {
             "content": "I'll use a tool to help you",
-            "tool_calls": [
-                {
-                    "id": "call_123",
-                    "function": {
-                        "name": "test_tool",
-                        "arguments": "{\"arg1\": \"test_value\"}"
-                    }
-                }
-            ]
+            "tool_calls": [_TOOL_CALL]
         }
         
         processed = await chat_session.process_llm_response(response)
@@ -884,26 +879,6 @@ async def test_process_llm_response_with_tool_calls(chat_session, mock_llm_provi
         mock_llm_provider._sanitize_response_content.assert_called_with("I'll use a tool to help you")
 
 
-@pytest.mark.asyncio
-async def test_process_llm_response_error(chat_session, mock_llm_provider):
-    """Test processing an LLM response that raises an exception."""
-    # Setup the sanitize mock to simply pass through
-    mock_llm_provider._sanitize_response_content.side_effect = lambda x: x
-
-    # Override the side_effect for this test to simulate an error
-    mock_llm_provider._sanitize_response_content.side_effect = Exception("Test error")
-    
-    # Create a response object
-    response = "This will trigger an error due to our mock"
-    
-    with patch("supernova.cli.chat_session.console.print"):
-        processed = await chat_session.process_llm_response(response)
-        
-        # Check that an error response was returned
-        assert processed["content"] == "Error processing LLM response"
-        assert processed["tool_results"] == []
-
-
 def test_process_assistant_response(chat_session):
     """Test processing the assistant's response."""
     # Create a mock response
@@ -941,7 +916,7 @@ def test_process_assistant_response(chat_session):
         assert "This is a test response" in str(call_arg)
 
 
-def test_process_assistant_response_with_tool_calls(chat_session):
+def test_process_assistant_response_with_tool_calls(mocker, chat_session):
     """Test processing an assistant response with tool calls."""
     # Create a response with tool calls
     response = {
@@ -965,36 +940,25 @@ def test_process_assistant_response_with_tool_calls(chat_session):
     }
     
     # Mock the necessary methods and modify process_assistant_response to return a custom message
-    with patch.object(chat_session, 'handle_terminal_command') as mock_handle_command:
-        with patch.object(chat_session, 'process_assistant_response', return_value="Assistant used tools to respond to your request."):
-            with patch("supernova.cli.chat_session.console.print"):
-                with patch("json.loads", return_value={"command": "echo 'test'"}):
-                    mock_handle_command.return_value = {
-                        "success": True,
-                        "output": "test",
-                        "command": "echo 'test'"
-                    }
-                    
-                    # Process the response
-                    result = chat_session.process_assistant_response(response)
-                    
-                    # Check that the result indicates tools were used
-                    assert "Assistant used tools" in result
+    mock_handle_command = mocker.patch.object(chat_session, 'handle_terminal_command')
+    mocker.patch.object(chat_session, 'process_assistant_response', return_value="Assistant used tools to respond to your request.")
+    mock_handle_command.return_value = {
+        "success": True,
+        "output": "test",
+        "command": "echo 'test'"
+    }
+    
+    # Process the response
+    result = chat_session.process_assistant_response(response)
+    
+    # Check that the result indicates tools were used
+    assert "Assistant used tools" in result
 
 
-def test_process_assistant_response_empty(chat_session):
+@pytest.mark.parametrize("response", [None, {}, ""], ids=["none", "empty_dict", "empty_string"])
+def test_process_assistant_response_empty(chat_session, response):
     """Test processing an empty assistant response."""
-    # Test with None response
-    result = chat_session.process_assistant_response(None)
-    assert result == "No response from the assistant."
-    
-    # Test with empty dict response
-    result = chat_session.process_assistant_response({})
-    assert result == "No response from the assistant."
-    
-    # Test with empty string response
-    result = chat_session.process_assistant_response("")
-    assert result == "No response from the assistant."
+    assert chat_session.process_assistant_response(response) == "No response from the assistant."
 
 
 def test_reset_streaming_state(chat_session):
@@ -1013,7 +977,6 @@ def test_reset_streaming_state(chat_session):
     assert chat_session._tool_calls_reported is False
 
 
-@pytest.mark.asyncio
 async def test_prompt_patching(chat_session):
     """Test patching the system prompt with project context."""
     # Test data
@@ -1033,4 +996,37 @@ async def test_prompt_patching(chat_session):
             assert session_state_summary in prompt
             
             # Check that the initial directory is included
-            assert str(chat_session.initial_directory) in prompt 
\ No newline at end of file
+            assert str(chat_session.initial_directory) in prompt 
+
+
+_FORMAT_JSON_VALUES = [
+    {"stdout": "line\n" * 3, "code": 0, "nested": {"items": [1, 2.5, None, True]}},
+    [{"a": "b"}, []],
+    {"big": 2 ** 70},
+    {"text": "h\u00e9llo \u2713", "float": 1e20},
+]
+
+
+@pytest.mark.parametrize("value", _FORMAT_JSON_VALUES)
+def test_format_json_round_trips(value):
+    """Test that tool results read back unchanged, with or without orjson."""
+    assert json.loads(_format_json(value)) == value
+
+
+@pytest.mark.parametrize("value", _FORMAT_JSON_VALUES)
+def test_format_json_without_orjson(monkeypatch, value):
+    """Test that without orjson the text is exactly the stdlib's."""
+    monkeypatch.setattr(_cs_mod, "orjson", None)
+    assert _format_json(value) == json.dumps(value, indent=2)
+
+
+@pytest.mark.skipif(_cs_mod.orjson is None, reason="orjson is not installed")
+@pytest.mark.parametrize("value,expected", [
+    ({"text": "h\u00e9llo"}, '{\n  "text": "h\u00e9llo"\n}'),
+    ({"nan": float("nan"), "inf": float("inf")}, '{\n  "nan": null,\n  "inf": null\n}'),
+    ({"float": 1e20}, '{\n  "float": 1e20\n}'),
+], ids=["non_ascii", "non_finite", "exponent"])
+def test_format_json_orjson_differences(value, expected):
+    """Test where the orjson text differs from json.dumps(value, indent=2)."""
+    assert _format_json(value) == expected
+    assert _format_json(value) != json.dumps(value, indent=2)
@@ -2,39 +2,140 @@
 Unit tests for the ChatSession's file reference processing.
 """
 
-import os
-import tempfile
-from pathlib import Path
+import copy
 import pytest
+from types import SimpleNamespace
 from unittest.mock import patch, MagicMock
 
 from supernova.cli.chat_session import ChatSession
-from supernova.tools.file_reference_tool import FileReferenceTool
+from supernova.core.tool_manager import ToolManager
+from supernova.persistence.db_manager import DatabaseManager
+
+
+# The provider and tool manager are never asserted on, so plain stubs stand
+# in for them instead of mocks.
+_PROVIDER_STUB = SimpleNamespace(
+    get_completion=lambda *args, **kwargs: {"content": "Test response", "tool_calls": []}
+)
+_TOOL_MANAGER_STUB = SimpleNamespace(
+    load_extension_tools=lambda: None,
+    get_available_tools_for_llm=lambda session_state=None: []
+)
+
+# References returned by the mocked file reference tool. The tool never
+# touches the disk, so the paths need not exist; tests must not mutate these.
+_FILE_REF = {
+    "path": "/project/test_file.txt",
+    "exists": True,
+    "type": "file",
+    "size": 20,
+    "content": "This is test content"
+}
+_FOLDER_REF = {
+    "path": "/project/test_subdir",
+    "exists": True,
+    "type": "folder",
+    "file_count": 2,
+    "folder_count": 0,
+    "files": ["file1.txt", "file2.txt"],
+    "folders": []
+}
+
+# Built once at import; patched_core only starts and stops them
+_CORE_PATCHERS = (
+    patch("supernova.core.llm_provider.get_provider", return_value=_PROVIDER_STUB),
+    patch(
+        "supernova.core.tool_manager.ToolManager",
+        spec=ToolManager,
+        return_value=_TOOL_MANAGER_STUB
+    ),
+)
+
+
+@pytest.fixture(scope="module")
+def patched_core():
+    """Patch the LLM provider lookup and tool manager once for the module."""
+    mocks = tuple(patcher.start() for patcher in _CORE_PATCHERS)
+    yield mocks
+    for patcher in reversed(_CORE_PATCHERS):
+        patcher.stop()
+
+
+@pytest.fixture(scope="module")
+def mock_config():
+    """Create a stub config shared by the module."""
+    return SimpleNamespace()
+
+
+@pytest.fixture(scope="module")
+def mock_db():
+    """Create a mock database manager shared by the module."""
+    return MagicMock(spec=DatabaseManager)
+
+
+@pytest.fixture(autouse=True)
+def _reset_mocks(patched_core, mock_db):
+    """Reset the shared mocks after each test."""
+    yield
+    for mock in (*patched_core, mock_db):
+        mock.reset_mock()
+
+
+@pytest.fixture(scope="module")
+def shared_tmp(tmp_path_factory):
+    """Create the working directory shared by the module's sessions.
+    
+    Nothing is written here; the file reference tool is always mocked.
+    """
+    return tmp_path_factory.mktemp("chatref")
+
+
+@pytest.fixture(scope="module")
+def _prototype_session(patched_core, mock_config, mock_db, shared_tmp):
+    """Build one ChatSession for the module instead of one per test."""
+    return ChatSession(
+        config=mock_config,
+        db=mock_db,
+        initial_directory=shared_tmp
+    )
+
+
+@pytest.fixture
+def session(_prototype_session):
+    """Return a copy of the prototype session.
+    
+    Only the session state and messages are reset. Tests patch the file
+    reference tool with mocker, which restores it afterwards. A test that
+    mutates any other attribute must reset it here too.
+    """
+    session = copy.copy(_prototype_session)
+    session.session_state = copy.deepcopy(_prototype_session.session_state)
+    session.messages = []
+    return session
+
+
+@pytest.fixture
+def make_exec_result():
+    """Return a factory for successful file reference tool results."""
+    def _make(file_refs=(), folder_refs=()):
+        return {
+            "success": True,
+            "references_found": bool(file_refs or folder_refs),
+            "file_references": list(file_refs),
+            "folder_references": list(folder_refs)
+        }
+    return _make
 
 
 class TestChatSessionFileReferences:
     """Test the file reference processing in ChatSession."""
     
-    def setup_method(self):
+    @pytest.fixture(autouse=True)
+    def setup_session(self, session, shared_tmp, mocker):
         """Set up the test environment."""
-        # Mock config and dependencies
-        self.config = MagicMock()
-        self.db = MagicMock()
-        
-        # Create a temporary directory for the tests
-        self.temp_dir = tempfile.TemporaryDirectory()
-        self.test_dir = Path(self.temp_dir.name)
-        
-        # Initialize the chat session with the test directory
-        self.session = ChatSession(
-            config=self.config,
-            db=self.db,
-            initial_directory=self.test_dir
-        )
-    
-    def teardown_method(self):
-        """Clean up after the tests."""
-        self.temp_dir.cleanup()
+        self.test_dir = shared_tmp
+        self.session = session
+        self.mocker = mocker
     
     def test_process_message_no_references(self):
         """Test that a message with no references is unchanged."""
@@ -49,7 +150,8 @@ class TestChatSessionFileReferences:
     def test_process_message_with_references_tool_fails(self):
         """Test handling when the file reference tool fails."""
         # Mock the file reference tool to return a failure
-        self.session.file_reference_tool.execute = MagicMock(
+        self.mocker.patch.object(
+            self.session.file_reference_tool, "execute",
             return_value={"success": False, "error": "Tool failed"}
         )
         
@@ -70,7 +172,8 @@ class TestChatSessionFileReferences:
     def test_process_message_no_references_found(self):
         """Test handling when no references are found in the message."""
         # Mock the file reference tool to return success but no references
-        self.session.file_reference_tool.execute = MagicMock(
+        self.mocker.patch.object(
+            self.session.file_reference_tool, "execute",
             return_value={"success": True, "references_found": False}
         )
         
@@ -82,31 +185,15 @@ class TestChatSessionFileReferences:
         # No context should be added
         assert context == ""
     
-    def test_process_message_with_file_references(self):
+    def test_process_message_with_file_references(self, make_exec_result):
         """Test processing a message with file references."""
-        # Create a test file
-        test_file = self.test_dir / "test_file.txt"
-        test_file.write_text("This is test content")
-        
         # Mock the file reference tool to return success with file data
-        self.session.file_reference_tool.execute = MagicMock(
-            return_value={
-                "success": True,
-                "references_found": True,
-                "file_references": [
-                    {
-                        "path": str(test_file),
-                        "exists": True,
-                        "type": "file",
-                        "size": 20,
-                        "content": "This is test content"
-                    }
-                ],
-                "folder_references": []
-            }
+        self.mocker.patch.object(
+            self.session.file_reference_tool, "execute",
+            return_value=make_exec_result(file_refs=[_FILE_REF])
         )
         
-        message = f"Check this file @File {test_file}"
+        message = f"Check this file @File {_FILE_REF['path']}"
         processed_message, context = self.session.process_message_references(message)
         
         # The processed message should include the file content
@@ -116,38 +203,18 @@ class TestChatSessionFileReferences:
         assert "0 folder references" in processed_message
         
         # The context should include the file content
-        assert str(test_file) in context
+        assert _FILE_REF["path"] in context
         assert "This is test content" in context
     
-    def test_process_message_with_folder_references(self):
+    def test_process_message_with_folder_references(self, make_exec_result):
         """Test processing a message with folder references."""
-        # Create test directory structure
-        test_subdir = self.test_dir / "test_subdir"
-        test_subdir.mkdir()
-        (test_subdir / "file1.txt").write_text("File 1 content")
-        (test_subdir / "file2.txt").write_text("File 2 content")
-        
         # Mock the file reference tool to return success with folder data
-        self.session.file_reference_tool.execute = MagicMock(
-            return_value={
-                "success": True,
-                "references_found": True,
-                "file_references": [],
-                "folder_references": [
-                    {
-                        "path": str(test_subdir),
-                        "exists": True,
-                        "type": "folder",
-                        "file_count": 2,
-                        "folder_count": 0,
-                        "files": ["file1.txt", "file2.txt"],
-                        "folders": []
-                    }
-                ]
-            }
+        self.mocker.patch.object(
+            self.session.file_reference_tool, "execute",
+            return_value=make_exec_result(folder_refs=[_FOLDER_REF])
         )
         
-        message = f"List files in @Folder {test_subdir}"
+        message = f"List files in @Folder {_FOLDER_REF['path']}"
         processed_message, context = self.session.process_message_references(message)
         
         # The processed message should include the folder info
@@ -157,50 +224,20 @@ class TestChatSessionFileReferences:
         assert "1 folder references" in processed_message
         
         # The context should include the folder structure
-        assert str(test_subdir) in context
+        assert _FOLDER_REF["path"] in context
         assert "Files (2)" in context
         assert "file1.txt" in context
         assert "file2.txt" in context
     
-    def test_process_message_with_both_references(self):
+    def test_process_message_with_both_references(self, make_exec_result):
         """Test processing a message with both file and folder references."""
-        # Create test file and directory structure
-        test_file = self.test_dir / "test_file.txt"
-        test_file.write_text("This is test content")
-        
-        test_subdir = self.test_dir / "test_subdir"
-        test_subdir.mkdir()
-        (test_subdir / "file1.txt").write_text("File 1 content")
-        
         # Mock the file reference tool to return success with both file and folder data
-        self.session.file_reference_tool.execute = MagicMock(
-            return_value={
-                "success": True,
-                "references_found": True,
-                "file_references": [
-                    {
-                        "path": str(test_file),
-                        "exists": True,
-                        "type": "file",
-                        "size": 20,
-                        "content": "This is test content"
-                    }
-                ],
-                "folder_references": [
-                    {
-                        "path": str(test_subdir),
-                        "exists": True,
-                        "type": "folder",
-                        "file_count": 1,
-                        "folder_count": 0,
-                        "files": ["file1.txt"],
-                        "folders": []
-                    }
-                ]
-            }
+        self.mocker.patch.object(
+            self.session.file_reference_tool, "execute",
+            return_value=make_exec_result(file_refs=[_FILE_REF], folder_refs=[_FOLDER_REF])
         )
         
-        message = f"Check @File {test_file} and @Folder {test_subdir}"
+        message = f"Check @File {_FILE_REF['path']} and @Folder {_FOLDER_REF['path']}"
         processed_message, context = self.session.process_message_references(message)
         
         # The processed message should include both file and folder info
@@ -210,8 +247,8 @@ class TestChatSessionFileReferences:
         assert "1 folder references" in processed_message
         
         # The context should include both file content and folder structure
-        assert str(test_file) in context
+        assert _FILE_REF["path"] in context
         assert "This is test content" in context
-        assert str(test_subdir) in context
-        assert "Files (1)" in context
-        assert "file1.txt" in context 
\ No newline at end of file
+        assert _FOLDER_REF["path"] in context
+        assert "Files (2)" in context
+        assert "file1.txt" in context
@@ -14,7 +14,8 @@ from supernova.config.loader import (
     _find_config_file,
     get_config_value,
     set_config_value,
-    save_config
+    save_config,
+    _YamlDumper,
 )
 from supernova.config.schema import SuperNovaConfig
 
@@ -195,9 +196,9 @@ def test_find_config_file_not_found(mock_exists):
         _find_config_file()
 
 
-def test_load_config_with_valid_path(temp_dir):
+def test_load_config_with_valid_path(tmp_path):
     """Test loading config from a valid file path."""
-    config_path = temp_dir / "test_config.yaml"
+    config_path = tmp_path / "test_config.yaml"
     test_config = {
         "llm_providers": {
             "test_provider": {
@@ -214,8 +215,7 @@ def test_load_config_with_valid_path(temp_dir):
         }
     }
     
-    with open(config_path, "w") as f:
-        yaml.dump(test_config, f)
+    config_path.write_text(yaml.dump(test_config, Dumper=_YamlDumper))
     
     # Patch the environment variable processing to avoid side effects
     with patch("supernova.config.loader._process_config_dict", return_value=test_config):
@@ -359,6 +359,15 @@ def test_get_config_value():
     value, type_name = get_config_value(config, "project_context.key_files")
     assert value == ["README.md", "pyproject.toml"]
     assert type_name == "list"
+    
+    # Test getting whole sections, which come back as plain dicts
+    value, type_name = get_config_value(config, "llm_providers.test_provider")
+    assert value == config.llm_providers["test_provider"].model_dump()
+    assert type_name == "dict"
+    
+    value, type_name = get_config_value(config, "llm_providers")
+    assert value == config.model_dump()["llm_providers"]
+    assert type_name == "dict"
 
 def test_get_config_value_not_found():
     """Test getting a non-existent configuration value."""
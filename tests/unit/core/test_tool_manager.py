@@ -68,6 +68,18 @@ def test_tool_manager_init():
     assert "terminal_command" in manager._tools
 
 
+def test_tool_managers_own_their_core_tools():
+    """Test that settings changed on one manager's tools do not reach another's."""
+    first = ToolManager()
+    second = ToolManager()
+    
+    assert first._tools["terminal_command"] is not second._tools["terminal_command"]
+    assert first._tools["file_reference"] is not second._tools["file_reference"]
+    
+    first._tools["terminal_command"].use_shell_pool = False
+    assert second._tools["terminal_command"].use_shell_pool is True
+
+
 def test_register_tool():
     """Test registering a tool with the manager."""
     manager = ToolManager()
@@ -505,9 +517,9 @@ def test_discover_tools_successfully(mock_iter_modules, mock_getmembers, mock_im
     
     # Configure getmembers to return the tool classes when inspecting the modules
     def mock_getmembers_side_effect(module, predicate=None):
-        if module == mock_module1:
+        if module is mock_module1:
             return [("Tool1", Tool1)]
-        elif module == mock_module2:
+        elif module is mock_module2:
             return [("Tool2", Tool2)]
         return []
     
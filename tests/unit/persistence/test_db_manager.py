@@ -9,6 +9,9 @@ import pytest
 
 from supernova.persistence.db_manager import DatabaseManager
 
+# The project-path lookups resolve the same "/test/project" path in every test
+pytestmark = pytest.mark.usefixtures("cached_path_resolve")
+
 
 @pytest.fixture
 def mock_connection():
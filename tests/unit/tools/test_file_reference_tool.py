@@ -102,30 +102,28 @@ class TestFileReferenceTool:
             if os.path.exists(temp_file_path):
                 os.unlink(temp_file_path)
     
-    def test_process_folder_references_with_real_folder(self):
+    def test_process_folder_references_with_real_folder(self, tmp_path):
         """Test processing a message with references to real folders."""
-        # Create a temporary directory with some files
-        with tempfile.TemporaryDirectory() as temp_dir:
-            # Create some files in the directory
-            (Path(temp_dir) / "file1.txt").write_text("Test content 1")
-            (Path(temp_dir) / "file2.txt").write_text("Test content 2")
-            # Create a subdirectory
-            subdir = Path(temp_dir) / "subdir"
-            subdir.mkdir()
-            
-            # Create message with reference to the temporary directory
-            message = f"List files in @Folder {temp_dir}"
-            result = self.tool.process_file_references(message, Path.cwd())
-            
-            assert result["success"] is True
-            assert result["references_found"] is True
-            assert len(result["folder_references"]) == 1
-            assert result["folder_references"][0]["exists"] is True
-            assert result["folder_references"][0]["file_count"] == 2
-            assert result["folder_references"][0]["folder_count"] == 1
-            assert "file1.txt" in result["folder_references"][0]["files"]
-            assert "file2.txt" in result["folder_references"][0]["files"]
-            assert "subdir" in result["folder_references"][0]["folders"]
+        # Create some files in pytest's temporary directory
+        (tmp_path / "file1.txt").write_text("Test content 1")
+        (tmp_path / "file2.txt").write_text("Test content 2")
+        # Create a subdirectory
+        subdir = tmp_path / "subdir"
+        subdir.mkdir()
+        
+        # Create message with reference to the temporary directory
+        message = f"List files in @Folder {tmp_path}"
+        result = self.tool.process_file_references(message, Path.cwd())
+        
+        assert result["success"] is True
+        assert result["references_found"] is True
+        assert len(result["folder_references"]) == 1
+        assert result["folder_references"][0]["exists"] is True
+        assert result["folder_references"][0]["file_count"] == 2
+        assert result["folder_references"][0]["folder_count"] == 1
+        assert "file1.txt" in result["folder_references"][0]["files"]
+        assert "file2.txt" in result["folder_references"][0]["files"]
+        assert "subdir" in result["folder_references"][0]["folders"]
     
     def test_execute(self):
         """Test the execute method."""
@@ -1,10 +1,19 @@
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from unittest.mock import patch, MagicMock, AsyncMock
 import asyncio
 import subprocess
+import sys
+import time
 import pytest
 
-from supernova.tools.terminal_command_tool import TerminalCommandTool
+from supernova.tools.terminal_command_tool import (
+    TerminalCommandTool, _PIPE_SIZE, _POSIX_SHELL, _ShellPool, _communicate, _kill_process_group,
+    _direct_argv, _print_output, _shell_executable, _spawn
+)
+
+# The directory pytest was started from, looked up once for the module
+_TEST_DIR = Path.cwd()
 
 
 @pytest.fixture
@@ -38,7 +47,7 @@ def test_execute_success(mock_popen, terminal_command_tool):
     
     result = terminal_command_tool.execute(
         command="echo 'hello'",
-        working_dir=str(Path.cwd())  # Use actual directory to avoid file not found
+        working_dir=str(_TEST_DIR)  # Use actual directory to avoid file not found
     )
     
     # Verify Popen was called
@@ -62,7 +71,7 @@ def test_execute_failure(mock_popen, terminal_command_tool):
     
     result = terminal_command_tool.execute(
         command="invalid_command",
-        working_dir=str(Path.cwd())  # Use actual directory
+        working_dir=str(_TEST_DIR)  # Use actual directory
     )
     
     # Verify Popen was called
@@ -116,7 +125,7 @@ def test_execute_cd_command(mock_popen, terminal_command_tool):
     # Execute cd command with a valid working directory
     result = terminal_command_tool.execute(
         command="cd /new/path",
-        working_dir=str(Path.cwd())  # Use actual directory
+        working_dir=str(_TEST_DIR)  # Use actual directory
     )
     
     # Verify Popen was called
@@ -139,7 +148,7 @@ def test_execute_complex_command(mock_popen, terminal_command_tool):
     # Execute complex command
     result = terminal_command_tool.execute(
         command="ls -la && echo 'hello'",
-        working_dir=str(Path.cwd())  # Use actual directory
+        working_dir=str(_TEST_DIR)  # Use actual directory
     )
     
     # Verify Popen was called with shell=True for complex commands
@@ -164,7 +173,7 @@ def test_execute_with_explanation(mock_popen, terminal_command_tool):
     result = terminal_command_tool.execute(
         command="ls -la",
         explanation="List files in directory",
-        working_dir=str(Path.cwd())
+        working_dir=str(_TEST_DIR)
     )
     
     # Verify Popen was called
@@ -251,6 +260,100 @@ def test_execute_parsing_error(mock_popen, mock_shlex, terminal_command_tool):
     assert result["success"] is True
 
 
+def test_communicate_drains_both_streams():
+    """Test that the shared-selector drain collects stdout and stderr."""
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import sys; print('x' * 100000); print('err', file=sys.stderr)"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    
+    stdout, stderr = _communicate(process, timeout=10)
+    
+    assert stdout == "x" * 100000 + "\n"
+    assert stderr.strip() == "err"
+    assert process.returncode == 0
+
+
+@patch("subprocess.Popen")
+def test_execute_command_requests_large_pipes(mock_popen, terminal_command_tool):
+    """Test that commands are spawned with an enlarged pipe buffer."""
+    mock_popen.side_effect = Exception("not spawned")
+    terminal_command_tool.use_shell_pool = False
+    
+    terminal_command_tool.execute_command("ls -la")
+    
+    _, kwargs = mock_popen.call_args
+    assert kwargs["pipesize"] == _PIPE_SIZE <= 1 << 20
+    assert kwargs["start_new_session"] is True
+
+
+@patch("subprocess.Popen")
+def test_execute_command_retries_without_large_pipes(mock_popen, terminal_command_tool, monkeypatch):
+    """Test that a refused pipe size falls back to default-sized pipes for good."""
+    monkeypatch.setattr("supernova.tools.terminal_command_tool._use_pipesize", True)
+    mock_popen.side_effect = [PermissionError("pipe quota"), Exception("not spawned"), Exception("not spawned")]
+    terminal_command_tool.use_shell_pool = False
+    
+    terminal_command_tool.execute_command("ls -la")
+    terminal_command_tool.execute_command("ls -la")
+    
+    first, second, third = mock_popen.call_args_list
+    assert "pipesize" in first.kwargs
+    assert "pipesize" not in second.kwargs
+    assert "pipesize" not in third.kwargs
+    assert second.kwargs["start_new_session"] is True
+
+
+def test_communicate_replaces_invalid_utf8():
+    """Test that undecodable output bytes do not raise."""
+    process = subprocess.Popen(
+        [sys.executable, "-c", "import sys; sys.stdout.buffer.write(b'ok\\xff')"],
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE
+    )
+    
+    stdout, stderr = _communicate(process, timeout=10)
+    
+    assert stdout == "ok\ufffd"
+    assert stderr == ""
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="process groups are POSIX only")
+def test_kill_process_group_stops_children():
+    """Test that a timed-out command's background children are killed too."""
+    process = subprocess.Popen(
+        "sleep 60 & echo $!; wait",
+        shell=True,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        start_new_session=True
+    )
+    child_pid = int(process.stdout.readline())
+    
+    _kill_process_group(process)
+    
+    assert process.returncode is not None
+    assert process.stdout.closed
+    stat_path = Path(f"/proc/{child_pid}/stat")
+    for _ in range(50):
+        if not stat_path.exists() or stat_path.read_text().split()[2] == "Z":
+            break
+        time.sleep(0.02)
+    else:
+        pytest.fail("background child survived the process group kill")
+
+
+@patch("supernova.tools.terminal_command_tool._console")
+def test_print_output_short_and_empty(mock_console):
+    """Test that empty output is skipped and short output is printed inline."""
+    _print_output("   \n", "Output")
+    mock_console.print.assert_not_called()
+    
+    _print_output("/home/user\n", "Output")
+    mock_console.print.assert_called_once_with("[dim]Output:[/dim] /home/user")
+
+
 def test_get_required_args(terminal_command_tool):
     """Test getting required arguments."""
     required_args = terminal_command_tool.get_required_args()
@@ -266,6 +369,14 @@ def test_get_optional_args(terminal_command_tool):
     assert "working_dir" in optional_args
 
 
+def test_schemas_are_shared(terminal_command_tool):
+    """Test that schemas and examples are built once, not per call."""
+    assert terminal_command_tool.get_arguments_schema() is terminal_command_tool.get_arguments_schema()
+    assert terminal_command_tool.get_usage_examples() is terminal_command_tool.get_usage_examples()
+    assert terminal_command_tool.get_schema()["parameters"] is terminal_command_tool.get_schema()["parameters"]
+    assert terminal_command_tool.get_schema()["name"] == "terminal_command"
+
+
 def test_get_usage_examples(terminal_command_tool):
     """Test getting usage examples."""
     examples = terminal_command_tool.get_usage_examples()
@@ -369,4 +480,449 @@ async def test_async_execute_with_context(terminal_command_tool):
         # but we're testing the function signature and basic flow
     finally:
         # Restore original execute method
-        terminal_command_tool.execute = original_execute 
\ No newline at end of file
+        terminal_command_tool.execute = original_execute 
+
+
+@pytest.mark.asyncio
+async def test_execute_many_preserves_order(terminal_command_tool, tmp_path):
+    """Test that batched commands run and return results in input order."""
+    results = await terminal_command_tool.execute_many(
+        ["echo first", "echo second", "exit 3"],
+        working_dir=tmp_path
+    )
+    
+    assert [r["success"] for r in results] == [True, True, False]
+    assert results[0]["stdout"].strip() == "first"
+    assert results[1]["stdout"].strip() == "second"
+    assert results[2]["code"] == 3
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX shells only")
+@pytest.mark.parametrize("command,expected", [
+    ("ls -la", ["ls", "-la"]),
+    ("git log --format=%H", ["git", "log", "--format=%H"]),
+    ('cat "a b.txt"', ["cat", "a b.txt"]),
+    ("ls *.py", None),
+    ("ls ~", None),
+    ("git status | head", None),
+    ("cd src && ls", None),
+    ("FOO=1 ls", None),
+    ("make build", None),
+    ("cat 'unterminated", None),
+])
+def test_direct_argv(command, expected):
+    """Test which commands skip the intermediate shell."""
+    assert _direct_argv(command) == expected
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX shells only")
+@patch("subprocess.Popen")
+def test_execute_command_runs_simple_commands_directly(mock_popen, terminal_command_tool):
+    """Test that simple commands are executed without a shell, even with the pool on."""
+    mock_popen.side_effect = Exception("not spawned")
+    
+    terminal_command_tool.execute({"command": "ls -la"})
+    
+    args, kwargs = mock_popen.call_args
+    assert args[0] == ["ls", "-la"]
+    assert "shell" not in kwargs
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX shells only")
+def test_execute_command_direct_missing_program(terminal_command_tool, tmp_path, monkeypatch):
+    """Test that a missing program still reports the shell's exit code."""
+    monkeypatch.setattr(
+        "supernova.tools.terminal_command_tool._DIRECT_COMMANDS",
+        frozenset({"definitely-not-a-command"})
+    )
+    terminal_command_tool.use_shell_pool = False
+    
+    result = terminal_command_tool.execute_command("definitely-not-a-command", working_dir=tmp_path)
+    
+    assert result["success"] is False
+    assert result["code"] == 127
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX shells only")
+def test_shell_executable():
+    """Test that bash is only selected for commands using bash tests."""
+    assert _shell_executable("ls -la && echo done") == "/bin/sh"
+    if Path("/bin/bash").exists():
+        assert _shell_executable("[[ -d src ]] && echo yes") == "/bin/bash"
+
+
+@patch("subprocess.Popen")
+def test_execute_builtin_commands_skip_subprocess(mock_popen, terminal_command_tool, tmp_path, monkeypatch):
+    """Test that pwd, echo $VAR and which are answered without spawning."""
+    monkeypatch.setenv("SUPERNOVA_TEST_VAR", "value")
+    
+    pwd = terminal_command_tool.execute_command("pwd", working_dir=tmp_path)
+    echo = terminal_command_tool.execute_command("echo $SUPERNOVA_TEST_VAR", working_dir=tmp_path)
+    which = terminal_command_tool.execute_command("which definitely-not-a-command", working_dir=tmp_path)
+    
+    mock_popen.assert_not_called()
+    assert pwd["success"] is True
+    assert pwd["stdout"] == str(tmp_path.resolve()) + "\n"
+    assert echo["stdout"] == "value\n"
+    assert which["success"] is False
+    assert which["code"] == 1
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX shells only")
+@pytest.mark.parametrize("value,answered", [
+    ("plain", True),
+    ("/usr/bin:/bin", True),
+    ("", True),
+    ("a   b", False),
+    ("*", False),
+    ("-n", False),
+    ("-e", False),
+    ("a\\tb", False),
+])
+def test_execute_builtin_echo_matches_shell(terminal_command_tool, tmp_path, monkeypatch, value, answered):
+    """Test that echo $VAR prints what the shell would, leaving hard values to the shell."""
+    (tmp_path / "file.txt").touch()
+    monkeypatch.setenv("SUPERNOVA_TEST_VAR", value)
+    
+    with patch("supernova.tools.terminal_command_tool._get_shell_pool", return_value=None), \
+            patch("supernova.tools.terminal_command_tool._spawn", wraps=_spawn) as spawn:
+        builtin = terminal_command_tool.execute_command("echo $SUPERNOVA_TEST_VAR", working_dir=tmp_path)
+    terminal_command_tool.use_builtins = False
+    shell = terminal_command_tool.execute_command("echo $SUPERNOVA_TEST_VAR", working_dir=tmp_path)
+    
+    assert builtin["stdout"] == shell["stdout"]
+    assert spawn.called is not answered
+
+
+# Built-in, direct and shell commands, which take different execution paths
+PATH_COMMANDS = ["pwd", "ls", "echo hi; true"]
+
+
+@pytest.mark.parametrize("use_shell_pool", [True, False], ids=["pool", "one_shot"])
+@pytest.mark.parametrize("command", PATH_COMMANDS)
+def test_execute_missing_working_dir(terminal_command_tool, tmp_path, command, use_shell_pool):
+    """Test that a missing working directory is reported the same way on every path."""
+    terminal_command_tool.use_shell_pool = use_shell_pool
+    missing = tmp_path / "missing"
+    
+    result = terminal_command_tool.execute({"command": command}, working_dir=missing)
+    
+    assert result == {"success": False, "error": f"Working directory does not exist: {missing}"}
+
+
+@pytest.mark.asyncio
+async def test_execute_async_missing_working_dir(terminal_command_tool, tmp_path):
+    """Test that the async path reports a missing working directory like the sync one."""
+    missing = tmp_path / "missing"
+    
+    result = await terminal_command_tool.execute_async({"command": "ls"}, working_dir=missing)
+    
+    assert result == {"success": False, "error": f"Working directory does not exist: {missing}"}
+
+
+@pytest.mark.skipif(sys.platform == "win32", reason="POSIX shells only")
+@pytest.mark.parametrize("use_shell_pool", [True, False], ids=["pool", "one_shot"])
+def test_execute_reads_stdin_from_devnull(terminal_command_tool, tmp_path, use_shell_pool):
+    """Test that commands see an empty stdin whether or not they use the pool."""
+    terminal_command_tool.use_shell_pool = use_shell_pool
+    
+    result = terminal_command_tool.execute({"command": "wc -c | tr -d ' '"}, working_dir=tmp_path)
+    
+    assert result["stdout"] == "0\n"
+
+
+@patch("subprocess.Popen")
+def test_execute_builtins_disabled(mock_popen, terminal_command_tool):
+    """Test that disabling built-ins runs pwd as a real process."""
+    mock_popen.side_effect = Exception("spawned")
+    terminal_command_tool.use_builtins = False
+    terminal_command_tool.use_shell_pool = False
+    
+    result = terminal_command_tool.execute_command("pwd")
+    
+    mock_popen.assert_called_once()
+    assert result["success"] is False
+
+
+@patch("subprocess.Popen")
+def test_execute_rejects_missing_command_arg(mock_popen, terminal_command_tool):
+    """Test that execute reports missing required args without spawning."""
+    result = terminal_command_tool.execute({"explanation": "no command"})
+    
+    mock_popen.assert_not_called()
+    assert result["success"] is False
+    assert result["error"] == "Missing required argument: command"
+    assert terminal_command_tool.validate_args({}) == {"valid": False, "missing": ["command"], "invalid": []}
+    assert terminal_command_tool.validate_args({"command": "ls"}) == {"valid": True, "missing": [], "invalid": []}
+
+
+@pytest.mark.asyncio
+async def test_execute_async_runs_subprocess(terminal_command_tool, tmp_path):
+    """Test that execute_async runs the command through asyncio."""
+    result = await terminal_command_tool.execute_async(
+        {"command": "echo async; echo warn >&2"},
+        working_dir=tmp_path
+    )
+    
+    assert result["success"] is True
+    assert result["stdout"] == "async\n"
+    assert result["stderr"] == "warn\n"
+    assert result["code"] == 0
+
+
+@pytest.mark.asyncio
+async def test_execute_async_timeout(terminal_command_tool, monkeypatch):
+    """Test that execute_async kills commands that exceed the timeout."""
+    monkeypatch.setattr("supernova.tools.terminal_command_tool._DEFAULT_TIMEOUT", 0.2)
+    
+    result = await terminal_command_tool.execute_async({"command": "sleep 5"})
+    
+    assert result["success"] is False
+    assert "timed out" in result["error"]
+
+
+def test_execute_coerces_timeout_arg(terminal_command_tool):
+    """Test that a string timeout is converted once and used for the run."""
+    args = {"command": "sleep 5", "timeout": "1"}
+    
+    start = time.monotonic()
+    result = terminal_command_tool.execute(args)
+    
+    assert time.monotonic() - start < 4
+    assert args["timeout"] == 1
+    assert result["success"] is False
+    assert "timed out" in result["error"]
+    
+    result = terminal_command_tool.execute({"command": "ls", "timeout": "soon"})
+    assert result == {"success": False, "error": "Argument must be an integer: timeout"}
+
+
+@pytest.mark.parametrize("timeout,expected", [
+    (0, 1),
+    (-5, 1),
+    ("45", 45),
+    (10**12, 600),
+])
+def test_validate_args_clamps_timeout(terminal_command_tool, timeout, expected):
+    """Test that LLM-supplied timeouts are kept between 1 and 600 seconds."""
+    args = {"command": "ls", "timeout": timeout}
+    
+    assert terminal_command_tool.validate_args(args)["valid"] is True
+    assert args["timeout"] == expected
+
+
+def test_execute_command_kills_child_on_error(terminal_command_tool, monkeypatch):
+    """Test that an unexpected error while waiting does not leave the child running."""
+    spawned = []
+    
+    def spawn(command, cwd):
+        spawned.append(_spawn(command, cwd))
+        return spawned[-1]
+    
+    def fail(process, timeout):
+        raise OverflowError("timestamp out of range")
+    
+    monkeypatch.setattr("supernova.tools.terminal_command_tool._spawn", spawn)
+    monkeypatch.setattr("supernova.tools.terminal_command_tool._communicate", fail)
+    terminal_command_tool.use_shell_pool = False
+    
+    result = terminal_command_tool.execute_command("sleep 5; true")
+    
+    assert result == {"success": False, "error": "Error executing command: timestamp out of range"}
+    assert spawned[0].returncode is not None
+
+
+@pytest.mark.parametrize("command,expected", [
+    ("ls -la", False),
+    ("git status", False),
+    ("rm -rf /", True),
+    ("RM -RF ~", True),
+    (":(){ :|:& };:", True),
+    ("echo data > /dev/sda", True),
+    ("sudo reboot", True),
+])
+def test_is_potentially_dangerous(terminal_command_tool, command, expected):
+    """Test the precompiled dangerous-command check."""
+    assert terminal_command_tool._is_potentially_dangerous(command) is expected
+
+
+@pytest.fixture
+def shell_pool():
+    """Create a dedicated shell pool and close it after the test."""
+    if _POSIX_SHELL is None:
+        pytest.skip("no POSIX shell available")
+    pool = _ShellPool(_POSIX_SHELL)
+    yield pool
+    pool.close()
+
+
+def test_shell_pool_isolates_commands(shell_pool, tmp_path):
+    """Test that cd, export and exit do not leak between pooled commands."""
+    assert shell_pool.run("cd /; export SN_POOL_VAR=1; exit 4", str(tmp_path), 10) == (4, "", "")
+    
+    returncode, stdout, stderr = shell_pool.run("pwd; echo \"[$SN_POOL_VAR]\"; printf tail", str(tmp_path), 10)
+    
+    assert returncode == 0
+    assert stdout == f"{tmp_path}\n[]\ntail"
+    assert stderr == ""
+
+
+def test_shell_pool_follows_environment(shell_pool, tmp_path, monkeypatch):
+    """Test that pooled commands see os.environ as it is when they run."""
+    monkeypatch.setenv("SN_POOL_ENV", "before")
+    assert shell_pool.run("echo \"$SN_POOL_ENV\"", str(tmp_path), 10) == (0, "before\n", "")
+    
+    monkeypatch.setenv("SN_POOL_ENV", "it's after")
+    assert shell_pool.run("echo \"$SN_POOL_ENV\"", str(tmp_path), 10) == (0, "it's after\n", "")
+    
+    monkeypatch.delenv("SN_POOL_ENV")
+    assert shell_pool.run("echo \"[${SN_POOL_ENV-unset}]\"", str(tmp_path), 10) == (0, "[unset]\n", "")
+
+
+def test_shell_pool_survives_syntax_error(shell_pool, tmp_path):
+    """Test that a malformed command does not desynchronize the shell."""
+    returncode, _, stderr = shell_pool.run("echo 'unterminated", str(tmp_path), 10)
+    
+    assert returncode != 0
+    assert stderr
+    assert shell_pool.run("echo ok", str(tmp_path), 10) == (0, "ok\n", "")
+
+
+def test_shell_pool_restarts_after_timeout(shell_pool, tmp_path):
+    """Test that a timed-out command kills the shell and the next call restarts it."""
+    with pytest.raises(subprocess.TimeoutExpired):
+        shell_pool.run("sleep 5", str(tmp_path), 0.2)
+    
+    assert shell_pool.run("echo again", str(tmp_path), 10) == (0, "again\n", "")
+
+
+def test_shell_pool_matches_one_shot_shell(terminal_command_tool, tmp_path):
+    """Test that pooled and one-shot commands run under the same shell."""
+    command = "echo -e 'a\\tb'"
+    pooled = terminal_command_tool.execute_command(command, working_dir=tmp_path)
+    terminal_command_tool.use_shell_pool = False
+    one_shot = terminal_command_tool.execute_command(command, working_dir=tmp_path)
+    
+    assert pooled["stdout"] == one_shot["stdout"]
+
+
+def test_shell_pool_busy_returns_none(shell_pool, tmp_path):
+    """Test that a busy pool declines the command instead of waiting for the lock."""
+    with shell_pool._lock:
+        assert shell_pool.run("echo queued", str(tmp_path), 10) is None
+    
+    assert shell_pool.run("echo ok", str(tmp_path), 10) == (0, "ok\n", "")
+
+
+def test_shell_pool_large_output(shell_pool, tmp_path):
+    """Test that output spanning many reads is returned whole, without the sentinels."""
+    command = f"{sys.executable} -c \"import sys; sys.stdout.write('x' * 300001); sys.stderr.write('e' * 70001)\""
+    
+    assert shell_pool.run(command, str(tmp_path), 10) == (0, "x" * 300001, "e" * 70001)
+
+
+def test_shell_pool_discards_shell_after_error(shell_pool, tmp_path, monkeypatch):
+    """Test that an error while reading does not leak output into the next command."""
+    with monkeypatch.context() as m:
+        # os.read rejects a size of None, failing after the command was written
+        m.setattr("supernova.tools.terminal_command_tool._READ_SIZE", None)
+        with pytest.raises(TypeError):
+            shell_pool.run("echo first", str(tmp_path), 10)
+    
+    assert shell_pool.run("echo second | cat", str(tmp_path), 10) == (0, "second\n", "")
+
+
+@pytest.fixture(scope="module")
+def shared_terminal_tool():
+    """Create one terminal command tool shared by the working-dir cases."""
+    return TerminalCommandTool()
+
+
+@pytest.fixture(scope="module")
+def working_dirs(tmp_path_factory):
+    """Create the directories used by the working-dir cases, resolved once."""
+    return {
+        "cwd": _TEST_DIR.resolve(),
+        "args": tmp_path_factory.mktemp("args_dir").resolve(),
+        "param": tmp_path_factory.mktemp("param_dir").resolve(),
+    }
+
+
+WORKING_DIR_CASES = [
+    # (working_dir in args, working_dir parameter, expected directory)
+    (None, None, "cwd"),
+    ("args", None, "args"),
+    (None, "param", "param"),
+    ("args", "param", "param"),
+]
+
+
+def _working_dir_call(working_dirs, args_dir, param_dir, command="pwd"):
+    """Build the args and working_dir parameter for a working-dir case."""
+    args = {"command": command}
+    if args_dir:
+        args["working_dir"] = str(working_dirs[args_dir])
+    working_dir = working_dirs[param_dir] if param_dir else None
+    return args, working_dir
+
+
+def _run_working_dir_case(tool, working_dirs, args_dir, param_dir):
+    """Build the call for a working-dir case and return the coroutine."""
+    args, working_dir = _working_dir_call(working_dirs, args_dir, param_dir)
+    return tool.execute_async(args, working_dir=working_dir)
+
+
+def _expected_dir(working_dirs, expected):
+    """Return the pwd output a working-dir case should report."""
+    return f"{working_dirs[expected]}\n"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("args_dir,param_dir,expected", WORKING_DIR_CASES)
+async def test_working_dir_handling(shared_terminal_tool, working_dirs, args_dir, param_dir, expected):
+    """Test that the working_dir parameter takes precedence over args."""
+    result = await _run_working_dir_case(shared_terminal_tool, working_dirs, args_dir, param_dir)
+    
+    assert result["success"] is True
+    assert result["stdout"] == _expected_dir(working_dirs, expected)
+
+
+@pytest.mark.asyncio
+async def test_working_dir_handling_concurrent(shared_terminal_tool, working_dirs):
+    """Test that concurrent calls each run in their own working directory."""
+    shared_terminal_tool.use_builtins = False
+    try:
+        results = await asyncio.gather(*(
+            _run_working_dir_case(shared_terminal_tool, working_dirs, args_dir, param_dir)
+            for args_dir, param_dir, _ in WORKING_DIR_CASES
+        ))
+    finally:
+        shared_terminal_tool.use_builtins = True
+    
+    for result, (_, _, expected) in zip(results, WORKING_DIR_CASES):
+        assert result["stdout"] == _expected_dir(working_dirs, expected)
+
+
+def test_working_dir_handling_threaded(shared_terminal_tool, working_dirs):
+    """Test that threads share the shell pool without waiting on each other.
+    
+    The command needs a shell, so it goes to the pool; threads that find the
+    pool busy run a one-shot process instead of queueing behind it.
+    """
+    delay = 0.5
+    calls = [
+        _working_dir_call(working_dirs, args_dir, param_dir, command=f"sleep {delay}; pwd")
+        for args_dir, param_dir, _ in WORKING_DIR_CASES
+    ]
+    
+    start = time.monotonic()
+    with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+        results = list(executor.map(
+            lambda call: shared_terminal_tool.execute(call[0], working_dir=call[1]),
+            calls
+        ))
+    elapsed = time.monotonic() - start
+    
+    for result, (_, _, expected) in zip(results, WORKING_DIR_CASES):
+        assert result["stdout"] == _expected_dir(working_dirs, expected)
+    assert elapsed < delay * len(calls)